@@ -0,0 +1,151 @@
+"""
+Memoizing caches for expensive fitness functions
+
+Once a swarm or population converges, many particles sit on (almost) the same
+position, and tournament selection and toolbox.clone fill a GA population with
+copies of the same few genomes. An expensive objective such as svc_example in
+pso_svc.py (a 3-fold cross validation for every particle) or a black box with a
+budget (BBComp) keeps paying for the same work. Both caches are decorators for
+toolbox.evaluate that remember the fitness of everything they have seen:
+
+    evaluation_cache = EvaluationCache(maxsize=1024, decimals=3, path="svc.cache")
+    toolbox.register("evaluate", svc_example, data=digits.data, targets=digits.target)
+    toolbox.decorate("evaluate", evaluation_cache)
+
+    genome_cache = GenomeCache(maxsize=4096, pack=True, path="onemax.cache")
+    toolbox.register("evaluate", evalOneMax)
+    toolbox.decorate("evaluate", genome_cache)
+
+- EvaluationCache keys a position by its bytes, rounded to `decimals` decimal
+  places so that near-duplicates share an entry (decimals=None for exact
+  matches)
+- GenomeCache keys a genome by a 128 bit hash of its bytes: xxhash's xxh3_128
+  when the xxhash package is installed, and hashlib's blake2b otherwise. With
+  pack=True, genomes of 0s and 1s are packed 8 genes to a byte before they are
+  hashed
+- at most `maxsize` entries are kept in memory, the least recently used entry
+  is dropped first
+- with a path, every evaluation is also stored on disk with shelve and found
+  again by later runs of the same objective. Use one path per objective or
+  problem
+- hits, misses and disk_hits count the lookups
+
+NOTE: only the position or genome is part of the key, the other arguments
+registered with the toolbox (e.g. the data set) are assumed to stay the same.
+"""
+import functools
+import hashlib
+import shelve
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+def digest(data):
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class Cache(object):
+
+    def __init__(self, maxsize, path=None):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.shelf = shelve.open(path) if path is not None else None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    # wraps a per-individual fitness function, returning a fitness tuple
+    def __call__(self, evaluate):
+
+        @functools.wraps(evaluate)
+        def cached(individual, *args, **kwargs):
+
+            key = self.key(individual)
+            values = self.lookup(key)
+            if values is None:
+                self.misses += 1
+                values = tuple(evaluate(individual, *args, **kwargs))
+                self.store(key, values)
+            else:
+                self.hits += 1
+            return values
+
+        return cached
+
+    # the bytes an individual is looked up by, defined by the subclasses
+    def key(self, individual):
+        raise NotImplementedError
+
+    def lookup(self, key):
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        if self.shelf is not None and key.hex() in self.shelf:
+            self.disk_hits += 1
+            values = self.shelf[key.hex()]
+            self.remember(key, values)
+            return values
+
+        return None
+
+    def store(self, key, values):
+        self.remember(key, values)
+        if self.shelf is not None:
+            self.shelf[key.hex()] = values
+
+    # adds an entry to memory, evicting the least recently used entry if full
+    def remember(self, key, values):
+        self.entries[key] = values
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def close(self):
+        if self.shelf is not None:
+            self.shelf.close()
+            self.shelf = None
+
+    def __str__(self):
+        return "{} hits ({} from disk), {} misses, {} entries".format(
+            self.hits, self.disk_hits, self.misses, len(self.entries))
+
+
+class EvaluationCache(Cache):
+
+    def __init__(self, maxsize=1024, decimals=None, path=None):
+        Cache.__init__(self, maxsize, path)
+        self.decimals = decimals
+
+    # the (quantized) position as bytes
+    def key(self, individual):
+        position = np.asarray(individual, dtype=float)
+        if self.decimals is not None:
+            # + 0. turns -0. into 0. so that both round to the same key
+            position = np.round(position, self.decimals) + 0.
+        return position.tobytes()
+
+
+class GenomeCache(Cache):
+
+    def __init__(self, maxsize=4096, pack=False, path=None):
+        Cache.__init__(self, maxsize, path)
+        self.pack = pack
+
+    # the hash of the genome's bytes, with its shape so that e.g. a (1, dim)
+    # and a (dim,) genome never share a key
+    def key(self, individual):
+        genome = np.asarray(individual)
+        if self.pack:
+            data = np.packbits(genome.astype(np.uint8, copy=False)).tobytes()
+        else:
+            data = np.ascontiguousarray(genome).tobytes()
+        return digest(str(genome.shape).encode() + data)
@@ -0,0 +1,87 @@
+"""
+Checkpointing for long PSO and GA runs
+
+SLURM kills a job at its time limit (pso.slurm asks for one hour, runjob.slurm
+for 20), so the scripts periodically save everything they need to carry on:
+the swarm or population with its fitness values, the generation counter, the
+random state and the statistics.
+
+The state is pickled straight away on the calling thread, which is a plain copy
+of the arrays and so works as a consistent snapshot, and the bytes are then
+written to disk on a background thread while the swarm keeps evolving. The file
+is written next to the checkpoint and moved over it once complete, so a job that
+is killed mid-write still leaves the previous checkpoint intact.
+
+Every snapshot also holds the parameters of the run (population size, number
+of generations, seed, ...), and load refuses a checkpoint written with other
+parameters instead of silently carrying on with a different run. A run that
+completes removes its checkpoint with finish, so the next run starts afresh.
+
+    params = {"population": POPULATION, "gmax": GMAX, "seed": SEED}
+    checkpointer = Checkpointer("pso_swarm.ckpt", frequency=10, params=params)
+    state = checkpointer.load()         # None if there is nothing to resume
+    ...
+    if checkpointer.due(g):
+        checkpointer.save({"gen": g, ...})
+    ...
+    checkpointer.finish()
+"""
+import os
+import pickle
+import threading
+
+
+class Checkpointer(object):
+
+    def __init__(self, path, frequency=10, params=None):
+        self.path = path
+        self.frequency = frequency
+        self.params = params
+        self.thread = None
+
+    # true if a checkpoint should be written at generation g
+    def due(self, g):
+        return self.frequency > 0 and g % self.frequency == 0
+
+    # returns the last saved state, or None if there is no checkpoint. Raises
+    # ValueError if the checkpoint belongs to a run with other parameters
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("params") != self.params:
+            raise ValueError("checkpoint %s was written with the parameters %s, not %s: "
+                             "delete it to start a new run" % (self.path, state.get("params"), self.params))
+        return state
+
+    # snapshots the state and writes it in the background. Only one write is
+    # in flight at a time, a slow disk holds up the next checkpoint rather than
+    # piling up snapshots in memory
+    def save(self, state):
+        data = pickle.dumps(dict(state, params=self.params), protocol=pickle.HIGHEST_PROTOCOL)
+        self.wait()
+        self.thread = threading.Thread(target=self.write, args=(data,))
+        self.thread.start()
+
+    # blocks until the last checkpoint is on disk
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    # the run is complete: waits for the last write and removes the checkpoint,
+    # so that the next run starts from scratch
+    def finish(self):
+        self.wait()
+        for path in (self.path, self.path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write(self, data):
+        temp = self.path + ".tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
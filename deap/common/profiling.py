@@ -0,0 +1,107 @@
+"""
+Per-generation profiling for the PSO and GA main loops
+
+Times each phase of a generation (toolbox.update, toolbox.select,
+toolbox.evaluate, the stats, the scoop map, ...) with the monotonic
+high-resolution clock and counts events such as evaluations and copies. At the
+end of each generation the totals are written as one JSON line to a trace file:
+
+    {"gen": 3, "time_ns": {"update": 81234, "evaluate": 402118}, "counts": {"evals": 50}}
+
+    profiler = profiling.profiler("pso_adjusted.trace.jsonl")
+    with profiler.phase("evaluate"):
+        particle.fitness.values = toolbox.evaluate(particle)
+    profiler.count("evals")
+    ...
+    profiler.record(g)
+    profiler.close()
+
+profiling.profiler(None) returns a profiler that does nothing, and whose phase
+is a shared no-op context manager, so the hooks can stay in the loops.
+"""
+import json
+import time
+
+
+class Phase(object):
+
+    __slots__ = ("name", "times", "start")
+
+    def __init__(self, name, times):
+        self.name = name
+        self.times = times
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        self.times[self.name] = self.times.get(self.name, 0) + time.perf_counter_ns() - self.start
+
+
+class Profiler(object):
+
+    # the trace is only opened on the first record, so that the scoop workers,
+    # which import the module but never record, leave it alone
+    def __init__(self, path):
+        self.path = path
+        self.trace = None
+        self.times = {}
+        self.counts = {}
+        self.phases = {}
+
+    # time spent inside the returned context manager is added to the phase
+    def phase(self, name):
+        if name not in self.phases:
+            self.phases[name] = Phase(name, self.times)
+        return self.phases[name]
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + int(n)
+
+    # writes the totals of generation g to the trace and starts over
+    def record(self, gen):
+        if self.trace is None:
+            self.trace = open(self.path, "a")
+        entry = {"gen": gen, "time_ns": dict(self.times), "counts": dict(self.counts)}
+        self.trace.write(json.dumps(entry) + "\n")
+        self.times.clear()
+        self.counts.clear()
+
+    def close(self):
+        if self.trace is not None:
+            self.trace.close()
+
+
+class NullPhase(object):
+
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+class NullProfiler(object):
+
+    null_phase = NullPhase()
+
+    def phase(self, name):
+        return self.null_phase
+
+    def count(self, name, n=1):
+        pass
+
+    def record(self, gen):
+        pass
+
+    def close(self):
+        pass
+
+# a profiler writing to path, or one that does nothing if path is None
+def profiler(path=None):
+    if path is None:
+        return NullProfiler()
+    return Profiler(path)
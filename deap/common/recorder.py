@@ -0,0 +1,118 @@
+"""
+Memory-bounded statistics recorder for the PSO and GA main loops
+
+tools.Statistics(lambda ind: ind.fitness.values) builds a list of fitness
+tuples every generation before np.mean, np.std, np.min and np.max each go over
+it again, and tools.Logbook keeps every record as a dict for the whole run.
+The Recorder takes the fitness values as one array (a swarm.Swarm's fitness,
+or fitnessArray(pop) for a list of particles or individuals), computes the
+aggregates with a few whole-array reductions, and keeps the history in a
+preallocated ring buffer, so that a 100k generation run takes as much memory
+as a short one:
+
+    recorder = Recorder(columns=["gen", "evals"], capacity=1000, every=10)
+    recorder.register("median", np.median)
+    ...
+    recorder.record(pop.fitness, gen=g, evals=50)
+    print(recorder.stream)
+
+    capacity    the number of records kept, older ones are overwritten
+    every       only every `every`-th record is kept (downsampling), the
+                latest record is always available as recorder.latest
+
+The records are printed like a tools.Logbook, and recorder.select(...) returns
+the kept history of the given columns as arrays, oldest first.
+"""
+import numpy as np
+
+FIELDS = ["avg", "std", "min", "max"]
+
+
+class Recorder(object):
+
+    def __init__(self, columns=("gen",), capacity=1000, every=1):
+        self.columns = list(columns)
+        self.capacity = capacity
+        self.every = every
+        self.functions = []
+        self.fields = list(FIELDS)
+
+        self.data = None
+        self.calls = 0
+        self.count = 0
+        self.streamed = 0
+        self.headed = False
+        self.latest = None
+
+    # extra aggregates, function takes the fitness array and returns a number.
+    # Everything must be registered before the first record
+    def register(self, name, function):
+        if self.data is not None:
+            raise RuntimeError("register %s before the first record" % name)
+        self.fields.append(name)
+        self.functions.append(function)
+
+    @property
+    def header(self):
+        return self.columns + self.fields
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def record(self, values, **columns):
+        values = np.asarray(values, dtype=float).ravel()
+        if self.data is None:
+            self.data = np.empty((self.capacity, len(self.header)))
+
+        # the std from the deviations from the mean (two passes), as the sum of
+        # squares minus the squared mean cancels out for large fitness values
+        n = len(values)
+        mean = np.add.reduce(values) / n
+        deviations = values - mean
+        var = deviations.dot(deviations) / n
+        row = [columns[name] for name in self.columns]
+        row += [mean, np.sqrt(var), np.minimum.reduce(values), np.maximum.reduce(values)]
+        row += [function(values) for function in self.functions]
+
+        self.latest = dict(zip(self.header, row))
+        self.calls += 1
+        if (self.calls - 1) % self.every == 0:
+            self.data[self.count % self.capacity] = row
+            self.count += 1
+
+    # the kept rows, oldest first
+    def rows(self, start=0):
+        start = max(start, self.count - self.capacity)
+        return self.data[np.arange(start, self.count) % self.capacity] \
+            if self.data is not None else np.empty((0, len(self.header)))
+
+    def select(self, *names):
+        rows = self.rows()
+        selected = tuple(rows[:, self.header.index(name)] for name in names)
+        return selected[0] if len(names) == 1 else selected
+
+    # the rows kept since the last call to stream, with the header the first
+    # time, formatted like tools.Logbook
+    @property
+    def stream(self):
+        lines = [] if self.headed else [self.header]
+        lines += [["{0:n}".format(value) for value in row] for row in self.rows(self.streamed)]
+        self.streamed = self.count
+        self.headed = True
+        if not lines:
+            return ""
+        widths = [max(len(line[i]) for line in lines) for i in range(len(self.header))]
+        return "\n".join("\t".join(value.ljust(width) for value, width in zip(line, widths))
+                         for line in lines)
+
+    def __str__(self):
+        streamed, headed = self.streamed, self.headed
+        self.streamed, self.headed = 0, False
+        text = self.stream
+        self.streamed, self.headed = streamed, headed
+        return text
+
+# the fitness values of a list of DEAP individuals as an array, without the
+# intermediate list of tuples
+def fitnessArray(pop, objective=0):
+    return np.fromiter((ind.fitness.values[objective] for ind in pop), dtype=float, count=len(pop))
@@ -0,0 +1,115 @@
+"""
+Reproducible random streams for the PSO and GA scripts
+
+Everything is derived from one master seed with NumPy's SeedSequence. A stream
+is identified by its spawn key, e.g. (particle, generation) or the index of an
+island, rather than by the process that happens to draw from it, so the same
+seed gives the same numbers whichever worker or rank ends up drawing from it
+and however many there are. Streams with different keys are statistically
+independent.
+
+DEAP's operators (selTournament, cxTwoPoint, mutFlipBit, ...) draw from the
+global python random module, so calling random.seed(64) only fixes the process
+it is called in; SCOOP workers start with their own unseeded state.
+
+    seedAll(seed)                         seeds random and np.random in this process
+    seedStream(seed, key)                 seeds them for the stream `key` instead
+    streamRandom(seed, key)               random.Random for the stream `key`
+    streamGenerator(seed, key)            np.random.Generator for the stream `key`
+    particleGenerator(seed, n, g)         generator for particle n in generation g
+    SwarmStreams(seed, start, stop)       drop-in generator for the rows
+                                          start:stop of a swarm.Swarm
+"""
+import random
+
+import numpy as np
+
+# number of particles that share one stream in SwarmStreams. Shards of a swarm
+# draw from the same blocks whatever their boundaries are
+BLOCK = 256
+
+# reserved first spawn key for each kind of stream, so that they never overlap
+GLOBAL_KEY = 0
+PARTICLE_KEY = 1
+SWARM_KEY = 2
+STREAM_KEY = 3
+
+# seeds the global python and numpy generators used on the master process,
+# e.g. by toolbox.population and the DEAP operators
+def seedAll(seed):
+    state = np.random.SeedSequence(seed, spawn_key=(GLOBAL_KEY,)).generate_state(2)
+    random.seed(int(state[0]))
+    np.random.seed(state[1])
+
+# seeds the global generators of a process that runs the single stream `key`,
+# e.g. an island, so that the DEAP operators draw from that stream
+def seedStream(seed, key):
+    state = streamSequence(seed, key).generate_state(2)
+    random.seed(int(state[0]))
+    np.random.seed(state[1])
+
+def streamSequence(seed, key):
+    if not isinstance(key, tuple):
+        key = (key,)
+    return np.random.SeedSequence(seed, spawn_key=(STREAM_KEY,) + key)
+
+# a python random.Random for the given key, for code that uses the random
+# module interface (e.g. the DEAP operators on a worker or island)
+def streamRandom(seed, key):
+    state = streamSequence(seed, key).generate_state(4)
+    return random.Random(int.from_bytes(state.tobytes(), "little"))
+
+# a numpy generator for the given key
+def streamGenerator(seed, key):
+    return np.random.default_rng(streamSequence(seed, key))
+
+# returns the generator for a single particle in a given generation. Only the
+# seed and the two integers need to be sent to a worker
+def particleGenerator(seed, particle, generation):
+    sequence = np.random.SeedSequence(seed, spawn_key=(PARTICLE_KEY, particle, generation))
+    return np.random.default_rng(sequence)
+
+
+class SwarmStreams(object):
+
+    # random numbers for the particles start:stop of a swarm of any size. Has
+    # the uniform(low, high, size) method of np.random, so it can be used as
+    # the generator of a swarm.Swarm. Every row is a particle, so size must be
+    # (stop - start, dim)
+    def __init__(self, seed, start, stop):
+        self.seed = seed
+        self.start = start
+        self.stop = stop
+        self.draws = 0
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        rows = self.stop - self.start
+        if np.ndim(size) != 1 or len(size) != 2 or size[0] != rows:
+            raise ValueError("SwarmStreams draws one row per particle, size must be (%i, dim), not %r"
+                             % (rows, size))
+        return low + (high - low) * self.random(size[1])
+
+    def random(self, dim):
+        rows = np.empty((self.stop - self.start, dim))
+        self.fill(rows)
+        return rows
+
+    # fills the (stop - start, dim) array rows in place. Every call uses fresh
+    # streams, one per block of BLOCK particles, and keeps only the rows that
+    # belong to start:stop
+    def fill(self, rows):
+
+        dim = rows.shape[1]
+        first = self.start // BLOCK
+        last = (self.stop - 1) // BLOCK
+
+        for block in range(first, last + 1):
+            key = (SWARM_KEY, self.draws, block)
+            generator = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=key))
+            values = generator.random((BLOCK, dim))
+
+            lo = max(self.start, block * BLOCK)
+            hi = min(self.stop, (block + 1) * BLOCK)
+            rows[lo - self.start:hi - self.start] = values[lo - block * BLOCK:hi - block * BLOCK]
+
+        self.draws = self.draws + 1
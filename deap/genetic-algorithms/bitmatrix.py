@@ -0,0 +1,93 @@
+"""
+Vectorised binary GA operators
+- Framework: DEAP (toolbox), NumPy
+
+Instead of one creator.Individual list of ints per individual, the whole
+population is kept as one (n, n_bits) uint8 matrix of 0s and 1s, with the
+fitness values in an (n,) array next to it. Each operator below works on the
+whole population at once and is the array version of the DEAP operator of the
+same name:
+
+    selTournament   tools.selTournament, returns the row indices of the winners
+    cxTwoPoint      tools.cxTwoPoint on the pairs of rows (0, 1), (2, 3), ...
+                    each pair mating with probability cxpb
+    mutFlipBit      tools.mutFlipBit on each row with probability mutpb
+    evalOneMax      sum(individual) for every row
+
+The variation operators change the rows in place and return a boolean mask of
+the rows they changed, so that only those are evaluated again, as with
+`del ind.fitness.values` in onemax_serial.py.
+
+Random numbers come from a np.random.Generator, e.g. seeding.streamGenerator.
+The crossover and mutation masks are built a block of rows at a time, so their
+temporaries stay around BLOCK_SIZE elements whatever the size of the population.
+"""
+import numpy as np
+
+# number of matrix elements handled at a time by the variation operators
+BLOCK_SIZE = 1 << 22
+
+# generates a population of n random individuals of n_bits bits
+def generate(n, n_bits, generator):
+    return generator.integers(0, 2, (n, n_bits), dtype=np.uint8)
+
+def evalOneMax(population):
+    return np.count_nonzero(population, axis=1)
+
+# k tournaments of tournsize aspirants drawn with replacement, the aspirant with
+# the highest fitness wins (the first one on ties, like max())
+def selTournament(fitness, k, tournsize, generator):
+    aspirants = generator.integers(0, len(fitness), (k, tournsize))
+    winners = np.argmax(fitness[aspirants], axis=1)
+    return aspirants[np.arange(k), winners]
+
+# rows start:stop of a matrix with rows of length n, in blocks of about
+# BLOCK_SIZE elements
+def blocks(start, stop, n):
+    step = max(1, BLOCK_SIZE // n)
+    for lo in range(start, stop, step):
+        yield lo, min(lo + step, stop)
+
+# swaps the bits [point1, point2) between the rows of each mating pair, with
+# 1 <= point1 < point2 <= n_bits as in tools.cxTwoPoint
+def cxTwoPoint(population, cxpb, generator):
+
+    n, n_bits = population.shape
+    pairs = n // 2
+    first = population[0:2 * pairs:2]
+    second = population[1:2 * pairs:2]
+
+    mates = np.flatnonzero(generator.random(pairs) < cxpb)
+    point1 = generator.integers(1, n_bits + 1, len(mates))
+    point2 = generator.integers(1, n_bits, len(mates))
+    point2 += point2 >= point1
+    point1, point2 = np.minimum(point1, point2), np.maximum(point1, point2)
+
+    columns = np.arange(n_bits)
+    for lo, hi in blocks(0, len(mates), n_bits):
+        rows = mates[lo:hi]
+        segment = (columns >= point1[lo:hi, np.newaxis]) & (columns < point2[lo:hi, np.newaxis])
+
+        # a ^ b on the segment turns a into b and b into a
+        swap = (first[rows] ^ second[rows]) & segment
+        first[rows] ^= swap
+        second[rows] ^= swap
+
+    changed = np.zeros(n, dtype=bool)
+    changed[2 * mates] = True
+    changed[2 * mates + 1] = True
+    return changed
+
+# flips each bit of a mutated row with probability indpb
+def mutFlipBit(population, mutpb, indpb, generator):
+
+    n, n_bits = population.shape
+    mutants = np.flatnonzero(generator.random(n) < mutpb)
+
+    for lo, hi in blocks(0, len(mutants), n_bits):
+        rows = mutants[lo:hi]
+        population[rows] ^= (generator.random((len(rows), n_bits)) < indpb).view(np.uint8)
+
+    changed = np.zeros(n, dtype=bool)
+    changed[mutants] = True
+    return changed
@@ -6,6 +6,7 @@ functions in the Black Box Optimisation functions.
 from ctypes import *
 from numpy.ctypeslib import ndpointer
 from numpy import *
+import os
 import sys
 import platform
 import json
@@ -14,6 +15,16 @@ from deap import base
 from deap import creator
 from deap import tools
 
+# the GA modules live in the parent directory, and the modules shared by the
+# PSO and GA scripts in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+import cache
+import cmaes
+import differential
+import realcoded
+import seeding
+
 # get library name
 dllname = ""
 if platform.system() == "Windows":
@@ -54,6 +65,25 @@ print("")
 TRACK = "trial"
 track = "trialMO"
 
+# evaluated genomes are remembered on disk, per track and problem
+CACHE_SIZE = 4096
+CACHE_PATH = "logs/onemax_adjusted_{}_{}.cache"
+
+# "deap" for the GA on DEAP individuals that main() has always run, or opt in
+# to an engine on the whole population matrix, minimising the first objective
+# in the box [0, 1]^dim: "realcoded" for the real-coded GA (realcoded.py), "de"
+# for differential evolution (differential.py), "cma" for CMA-ES with IPOP
+# restarts (cmaes.py)
+ENGINE = "deap"
+SEED = 64
+POPULATION = 200
+BOUND_L, BOUND_U = 0.0, 1.0
+ETA_CX, ETA_MUT = 15.0, 20.0
+DE_F, DE_CR = 0.5, 0.9
+DE_STRATEGY = "rand/1/bin"      # or "current-to-best/1/bin"
+CMA_SIGMA = 0.3                 # First step size of every restart
+CMA_LAMBDA = None               # First population size, None for 4 + 3 ln(dim)
+
 # set configuration options (this is optional)
 result = bbcomp.configure(1, "logs/".encode('ascii'))
 if result == 0:
@@ -139,17 +169,20 @@ toolbox.register("individual", tools.initRepeat, creator.Individual,
 toolbox.register("population", tools.initRepeat, list, toolbox.individual)
 
 
+# raised by evalBbcomp once the budget is used up, rather than returning a
+# made-up fitness that the genome cache would store as real
+class BudgetExhausted(Exception):
+	pass
+
 def evalBbcomp(individual):
 
 	global evals
 
-	# initialise the values
-	individual.fitness.values = zeros(obj)
-	# create a temp array to calculate the values (converts to array form)
-	values = array(individual.fitness.values)
-
 	if (evals >= bud):
-		return values
+		raise BudgetExhausted()
+
+	# create a temp array to calculate the values (converts to array form)
+	values = zeros(obj)
 
 	# evaluate the points and the values (array form)
 	result = bbcomp.evaluate(individual, values)
@@ -166,12 +199,95 @@ def evalBbcomp(individual):
 	return values
 
 toolbox.register("evaluate", evalBbcomp)
+
+# a genome that has been evaluated before, in this run or an earlier one, does
+# not use up any more of the budget
+genome_cache = cache.GenomeCache(maxsize=CACHE_SIZE, path=CACHE_PATH.format(track, problemID))
+toolbox.decorate("evaluate", genome_cache)
 toolbox.register("mate", tools.cxOnePoint)
 #toolbox.register("mutate", tools.mutFlipBit, indpb=0.05)
 # use a different mutation method
 toolbox.register("mutate", tools.mutShuffleIndexes, indpb=0.05)
 toolbox.register("select", tools.selTournament, tournsize=3)
 
+# evaluates the rows of a (m, dim) batch of points one after the other, through
+# the genome cache, until the budget is used up. Returns the (m, obj) values,
+# inf for the points left unevaluated. The black box writes straight into the
+# rows of out, a C-contiguous (m, obj) array, if it is given
+def evalBbcompBatch(points, out=None):
+
+	global evals
+
+	points = ascontiguousarray(points, dtype=float64)
+	values = out if out is not None else empty((len(points), obj))
+	values.fill(inf)
+	for i in range(len(points)):
+		point = points[i]
+
+		key = genome_cache.key(point)
+		cached = genome_cache.lookup(key)
+		if cached is not None:
+			genome_cache.hits += 1
+			values[i] = cached
+			continue
+
+		if (evals >= bud):
+			break
+
+		result = bbcomp.evaluate(point, values[i])
+		if result == 0:
+			sys.exit("evaluate() failed: " + str(bbcomp.errorMessage().decode("ascii")))
+
+		evals += 1
+		genome_cache.misses += 1
+		genome_cache.store(key, tuple(values[i]))
+		print("[{}],{},{}".format(evals, point, values[i]))
+
+	return values
+
+# the points and values of the evaluations already used up on this problem, as
+# (evals, dim) and (evals, obj) arrays
+def loadHistory():
+
+	points = zeros((evals, dim))
+	values = zeros((evals, obj))
+	for i in range(evals):
+		result = bbcomp.history(i, points[i], values[i])
+		if result == 0:
+			sys.exit("history() failed: " + str(bbcomp.errorMessage().decode("ascii")))
+
+	return points, values
+
+realtoolbox = base.Toolbox()
+realtoolbox.register("population", realcoded.generate, bound_l=BOUND_L, bound_u=BOUND_U)
+realtoolbox.register("evaluate", evalBbcompBatch)
+realtoolbox.register("mate", realcoded.cxSimulatedBinaryBounded, cxpb=0.9, eta=ETA_CX,
+                     bound_l=BOUND_L, bound_u=BOUND_U)
+realtoolbox.register("mutate", realcoded.mutPolynomialBounded, mutpb=0.2, eta=ETA_MUT,
+                     bound_l=BOUND_L, bound_u=BOUND_U, indpb=1.0 / dim)
+realtoolbox.register("select", realcoded.selTournament, tournsize=3, weight=-1.0)
+
+detoolbox = base.Toolbox()
+detoolbox.register("population", differential.generate, bound_l=BOUND_L, bound_u=BOUND_U)
+detoolbox.register("evaluate", evalBbcompBatch)
+if DE_STRATEGY == "current-to-best/1/bin":
+	detoolbox.register("trial", differential.deCurrentToBest1Bin, f=DE_F, cr=DE_CR,
+	                   bound_l=BOUND_L, bound_u=BOUND_U, weight=-1.0)
+else:
+	detoolbox.register("trial", differential.deRand1Bin, f=DE_F, cr=DE_CR,
+	                   bound_l=BOUND_L, bound_u=BOUND_U)
+detoolbox.register("select", differential.selReplace, weight=-1.0)
+
+# evaluates the individuals in order, returns False if the budget ran out
+# before all of them were evaluated
+def evaluateAll(individuals):
+	try:
+		for ind in individuals:
+			ind.fitness.values = toolbox.evaluate(ind)
+	except BudgetExhausted:
+		return False
+	return True
+
 def main():
     random.seed(64)
 
@@ -182,9 +298,9 @@ def main():
     print("Start of evolution")
 
     # Evaluate the entire population
-    fitnesses = list(map(toolbox.evaluate, pop))
-    for ind, fit in zip(pop, fitnesses):
-        ind.fitness.values = fit
+    if not evaluateAll(pop):
+        print("The budget ran out before the population was evaluated")
+        return
 
     # Extracting all the fitnesses from the individuals
     fits = [ind.fitness.values[0] for ind in pop]
@@ -210,10 +326,18 @@ def main():
                 toolbox.mutate(mutant[0])
                 del mutant.fitness.values
 
+        # the last complete generation is kept if the budget runs out
         invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-        fitnesses = map(toolbox.evaluate, invalid_ind)
-        for ind, fit in zip(invalid_ind, fitnesses):
-            ind.fitness.values = fit
+        used = evals
+        if not evaluateAll(invalid_ind):
+            break
+
+        # every offspring was in the genome cache, the population has converged
+        # and would loop forever without using any budget
+        if evals == used:
+            print("No new genomes in generation %i, stopping" % g)
+            pop[:] = offspring
+            break
 
         pop[:] = offspring
 
@@ -232,20 +356,164 @@ def main():
     best_ind = tools.selBest(pop, 1)[0]
     print("Best individual is %s, with value %s" % (best_ind, best_ind.fitness.values))
 
+# the same generational GA on the (POPULATION, dim) matrix: each generation
+# the changed offspring go to the black box as one batch
+def mainRealCoded():
+
+    generator = seeding.streamGenerator(SEED, problemID)
+    pop = realtoolbox.population(POPULATION, dim, generator=generator)
+
+    print("Start of evolution")
+
+    # Evaluate the entire population, on the first objective
+    fitness = realtoolbox.evaluate(pop)[:, 0]
+    best = argmin(fitness)
+    best_point, best_value = pop[best].copy(), fitness[best]
+
+    g = 0
+    while (evals < bud):
+        g = g + 1
+        print("-- Generation %i --" % g)
+
+        # Select the next generation individuals, indexing makes the copies
+        chosen = realtoolbox.select(fitness, len(pop), generator=generator)
+        offspring = pop[chosen]
+        fitness = fitness[chosen]
+
+        # Apply crossover and mutation on the offspring
+        invalid = realtoolbox.mate(offspring, generator=generator)
+        invalid |= realtoolbox.mutate(offspring, generator=generator)
+
+        used = evals
+        fitness[invalid] = realtoolbox.evaluate(offspring[invalid])[:, 0]
+        pop = offspring
+
+        # the population may lose its best point, so keep it aside
+        best = argmin(fitness)
+        if fitness[best] < best_value:
+            best_point, best_value = pop[best].copy(), fitness[best]
+
+        # every changed offspring was in the genome cache, e.g. clipped onto
+        # the same points of a bound, and would loop forever without using any
+        # budget
+        if evals == used:
+            print("No new genomes in generation %i, stopping" % g)
+            break
+
+        evaluated = fitness[isfinite(fitness)]
+        print("  Min %s" % evaluated.min())
+        print("  Max %s" % evaluated.max())
+        print("  Avg %s" % evaluated.mean())
+        print("  Std %s" % evaluated.std())
+
+    print("Best individual is %s, with value %s" % (best_point, best_value))
+
+# differential evolution on the (POPULATION, dim) matrix: each generation the
+# trial vectors of the whole population go to the black box as one batch
+def mainDifferential():
+
+    generator = seeding.streamGenerator(SEED, problemID)
+    pop = detoolbox.population(POPULATION, dim, generator=generator)
+
+    print("Start of evolution")
+
+    # Evaluate the entire population, on the first objective
+    fitness = detoolbox.evaluate(pop)[:, 0]
+
+    g = 0
+    while (evals < bud):
+        g = g + 1
+        print("-- Generation %i --" % g)
+
+        # the targets only ever get better, so pop holds the best point
+        used = evals
+        trials = detoolbox.trial(pop, fitness, generator=generator)
+        replaced = detoolbox.select(pop, fitness, trials, detoolbox.evaluate(trials)[:, 0])
+
+        # every trial was in the genome cache, e.g. once the population has
+        # collapsed onto a corner of the box, and would loop forever without
+        # using any budget
+        if evals == used:
+            print("No new genomes in generation %i, stopping" % g)
+            break
+
+        evaluated = fitness[isfinite(fitness)]
+        print("  Replaced %i" % count_nonzero(replaced))
+        print("  Min %s" % evaluated.min())
+        print("  Max %s" % evaluated.max())
+        print("  Avg %s" % evaluated.mean())
+        print("  Std %s" % evaluated.std())
+
+    best = argmin(fitness)
+    print("Best individual is %s, with value %s" % (pop[best], fitness[best]))
+
+# CMA-ES with IPOP restarts: each generation the lambda points are sampled as
+# one matrix and evaluated into the same values buffer. When a run converges
+# or stalls, the next one starts from a random point with twice the population,
+# as long as there is budget left. After a crash the first run starts around
+# the best points of the history instead, with their spread as step size
+def mainCMA(history):
+
+    generator = seeding.streamGenerator(SEED, problemID)
+    lambda0 = CMA_LAMBDA or cmaes.populationSize(dim)
+
+    points, values = history
+    if len(points) > 0:
+        best = points[argsort(values[:, 0])[:lambda0 // 2]]
+        centroid = best.mean(axis=0)
+        sigma = clip(best.std(axis=0).mean(), 1e-3, CMA_SIGMA)
+        print("Resuming from the best of %i evaluations" % len(points))
+    else:
+        centroid = generator.uniform(BOUND_L, BOUND_U, dim)
+        sigma = CMA_SIGMA
+
+    best_point, best_value = None, inf
+    restart = 0
+    while (evals < bud):
+        lambda_ = int(clip(bud - evals, 2, lambda0 * 2 ** restart))
+        strategy = cmaes.Strategy(centroid, sigma, lambda_=lambda_, generator=generator,
+                                  bound_l=BOUND_L, bound_u=BOUND_U)
+        fitness = empty((lambda_, obj))
+        print("-- Restart %i, lambda %i --" % (restart, lambda_))
+
+        while (evals < bud) and strategy.stop() is None:
+            population = strategy.ask()
+            evalBbcompBatch(population, out=fitness)
+            strategy.tell(population, fitness[:, 0])
+
+            best = argmin(fitness[:, 0])
+            if fitness[best, 0] < best_value:
+                best_point, best_value = population[best].copy(), fitness[best, 0]
+
+        print("  Stopped after %i generations: %s" % (strategy.generation, strategy.stop()))
+        print("  Sigma %s" % strategy.sigma)
+        print("  Best %s" % best_value)
+
+        restart = restart + 1
+        centroid = generator.uniform(BOUND_L, BOUND_U, dim)
+        sigma = CMA_SIGMA
+
+    print("Best individual is %s, with value %s" % (best_point, best_value))
+
 if __name__ == "__main__":
 
-	if evals > 0:
-		point = zeros(dim)
-		value = zeros(obj)
-		for i in range(evals):
-			result = bbcomp.history(i, point, value)
-			if result == 0:
-				sys.exit("history() failed: " + str(bbcomp.errorMessage().decode("ascii")))
-			print(point, value)
-
-	main()
-	if evals < bud:
+	history = loadHistory()
+	for point, value in zip(*history):
+		print(point, value)
+
+	if ENGINE == "realcoded":
+		mainRealCoded()
+	elif ENGINE == "de":
+		mainDifferential()
+	elif ENGINE == "cma":
+		mainCMA(history)
+	else:
 		main()
+		if evals < bud:
+			main()
+
+	print(genome_cache)
+	genome_cache.close()
 
 """
 # when using evaluate, since it changes it in place, make a copy of the value
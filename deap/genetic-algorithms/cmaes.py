@@ -0,0 +1,136 @@
+"""
+Batched ask/tell CMA-ES
+- Framework: NumPy
+
+deap.cma.Strategy.generate builds its individuals one by one. Strategy here
+samples the whole lambda population as one (lambda, dim) matrix, and updates
+the mean, the evolution paths, the step size and the covariance matrix (rank-one
+and rank-mu) with whole-matrix operations:
+
+    strategy = cmaes.Strategy(centroid, sigma=0.3, lambda_=12, generator=generator)
+    while strategy.stop() is None:
+        points = strategy.ask()
+        strategy.tell(points, evaluate(points))
+
+The fitness is minimised. The sampled points are clipped into the box
+[bound_l, bound_u], and the strategy is updated with the clipped points, so
+the search never leaves the box. ask() returns the same buffer every
+generation, so copy the points to keep them.
+
+stop() gives the reason the search has converged or stalled, None otherwise,
+for restarts with a larger population (IPOP-CMA-ES, Auger and Hansen 2005).
+The parameters follow Hansen, "The CMA Evolution Strategy: A Tutorial".
+"""
+import numpy as np
+
+TOLX = 1e-12            # Step size, relative to the first one, to stop at
+TOLFUN = 1e-12          # Spread of the recent best values to stop at
+CONDITION = 1e14        # Condition number of the covariance matrix to stop at
+
+# the default population size for a problem of dim dimensions
+def populationSize(dim):
+    return 4 + int(3 * np.log(dim))
+
+
+class Strategy(object):
+
+    def __init__(self, centroid, sigma, lambda_=None, generator=None, bound_l=0.0, bound_u=1.0):
+        self.mean = np.array(centroid, dtype=float)
+        self.dim = dim = len(self.mean)
+        self.sigma = self.sigma0 = float(sigma)
+        self.lambda_ = lambda_ = lambda_ or populationSize(dim)
+        self.generator = generator if generator is not None else np.random.default_rng()
+        self.bound_l = bound_l
+        self.bound_u = bound_u
+
+        # the weights of the best mu points in the new mean
+        self.mu = mu = lambda_ // 2
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = mueff = 1.0 / (self.weights ** 2).sum()
+
+        # learning rates of the paths, the step size and the covariance matrix
+        self.cc = (4 + mueff / dim) / (dim + 4 + 2 * mueff / dim)
+        self.cs = (mueff + 2) / (dim + mueff + 5)
+        self.c1 = 2 / ((dim + 1.3) ** 2 + mueff)
+        self.cmu = min(1 - self.c1, 2 * (mueff - 2 + 1 / mueff) / ((dim + 2) ** 2 + mueff))
+        self.damps = 1 + 2 * max(0, np.sqrt((mueff - 1) / (dim + 1)) - 1) + self.cs
+        self.chiN = np.sqrt(dim) * (1 - 1 / (4 * dim) + 1 / (21 * dim ** 2))
+
+        self.pc = np.zeros(dim)
+        self.ps = np.zeros(dim)
+        self.C = np.eye(dim)
+        self.B = np.eye(dim)
+        self.D = np.ones(dim)
+        self.update_count = 0
+
+        # the sample buffers, reused every generation
+        self.z = np.empty((lambda_, dim))
+        self.y = np.empty((lambda_, dim))
+        self.points = np.empty((lambda_, dim))
+
+        self.generation = 0
+        self.best_values = []
+
+    # samples lambda points from N(mean, sigma^2 C), clipped into the box
+    def ask(self):
+        self.generator.standard_normal(out=self.z)
+        np.multiply(self.z, self.D, out=self.y)
+        np.matmul(self.y, self.B.T, out=self.y)
+        np.multiply(self.y, self.sigma, out=self.points)
+        np.add(self.points, self.mean, out=self.points)
+        np.clip(self.points, self.bound_l, self.bound_u, out=self.points)
+        return self.points
+
+    # updates the strategy from the points and their values, lower is better.
+    # Points without a finite value (e.g. out of budget) are ignored
+    def tell(self, points, values):
+        values = np.asarray(values, dtype=float)
+        order = np.argsort(values)
+        order = order[np.isfinite(values[order])][:self.mu]
+        if len(order) < self.mu:
+            return
+
+        self.generation += 1
+        self.best_values.append(values[order[0]])
+
+        # the steps of the best points, from the mean they were sampled around
+        old = self.mean
+        y = (points[order] - old) / self.sigma
+        ymean = self.weights.dot(y)
+        self.mean = old + self.sigma * ymean
+
+        # C^-1/2 ymean = B D^-1 B^T ymean
+        invsqrt = self.B.dot(self.B.T.dot(ymean) / self.D)
+        self.ps = (1 - self.cs) * self.ps + np.sqrt(self.cs * (2 - self.cs) * self.mueff) * invsqrt
+        norm = np.linalg.norm(self.ps)
+        hsig = norm / np.sqrt(1 - (1 - self.cs) ** (2 * self.generation)) / self.chiN \
+            < 1.4 + 2 / (self.dim + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * ymean
+
+        # rank-one update from the path, rank-mu update from the weighted steps
+        rank_one = np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C
+        rank_mu = (y.T * self.weights).dot(y)
+        self.C = (1 - self.c1 - self.cmu) * self.C + self.c1 * rank_one + self.cmu * rank_mu
+
+        self.sigma *= np.exp((self.cs / self.damps) * (norm / self.chiN - 1))
+
+        # the eigendecomposition is only redone every few generations, as it
+        # costs O(dim^3)
+        self.update_count += 1
+        if self.update_count >= max(1, int(1 / ((self.c1 + self.cmu) * self.dim * 10))):
+            self.update_count = 0
+            self.C = np.triu(self.C) + np.triu(self.C, 1).T
+            eigenvalues, self.B = np.linalg.eigh(self.C)
+            self.D = np.sqrt(np.maximum(eigenvalues, 1e-30))
+
+    # the reason to restart, or None
+    def stop(self):
+        if self.sigma * self.D.max() < TOLX * self.sigma0:
+            return "tolx"
+        if (self.D.max() / self.D.min()) ** 2 > CONDITION:
+            return "condition"
+        recent = self.best_values[-(10 + int(30 * self.dim / self.lambda_)):]
+        if self.generation > len(recent) and max(recent) - min(recent) < TOLFUN:
+            return "tolfun"
+        return None
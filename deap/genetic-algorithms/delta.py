@@ -0,0 +1,112 @@
+"""
+Delta fitness evaluation for additively separable objectives
+
+After crossover or mutation an offspring is usually re-evaluated from scratch,
+e.g. sum(individual) for OneMax, even if only a few of its genes changed. When
+the objective is a sum of per-gene terms
+
+    f(individual) = sum_i gene(i, individual[i])
+
+the new fitness is the old one plus the difference of the changed terms, which
+takes O(changed genes) instead of O(len(individual)).
+
+The variation operators below are tools.cxTwoPoint and tools.mutFlipBit, drawing
+the same random numbers, that also record the old value of every gene they
+change (in individual.changes) and the fitness before the first change (in
+individual.base). DeltaEvaluation is a decorator for toolbox.evaluate that uses
+them when they are there, and calls the full evaluation otherwise:
+
+    toolbox.register("evaluate", evalOneMax)
+    toolbox.decorate("evaluate", delta.DeltaEvaluation(delta.identity))
+    toolbox.register("mate", delta.cxTwoPoint)
+    toolbox.register("mutate", delta.mutFlipBit, indpb=0.05)
+
+NOTE: an operator that does not record its changes (e.g. the plain DEAP ones)
+must not be mixed with these on the same individual, or the delta is wrong.
+Individuals changed before they were ever evaluated are evaluated in full.
+"""
+import functools
+import random
+
+# the term of a gene in OneMax
+def identity(index, value):
+    return value
+
+# starts recording the changes to an individual, with its current fitness as
+# the base of the delta. If the fitness is not valid, the individual has been
+# changed by something else first and cannot be tracked
+def track(individual):
+    if getattr(individual, "changes", None) is None and individual.fitness.valid:
+        individual.changes = {}
+        individual.base = individual.fitness.values
+
+# records the old value of gene `index` before it is changed
+def record(individual, index, old):
+    changes = getattr(individual, "changes", None)
+    if changes is not None:
+        changes.setdefault(index, old)
+
+def cxTwoPoint(ind1, ind2):
+    track(ind1)
+    track(ind2)
+
+    size = min(len(ind1), len(ind2))
+    cxpoint1 = random.randint(1, size)
+    cxpoint2 = random.randint(1, size - 1)
+    if cxpoint2 >= cxpoint1:
+        cxpoint2 += 1
+    else:
+        cxpoint1, cxpoint2 = cxpoint2, cxpoint1
+
+    # only the genes that differ change anything
+    for i in range(cxpoint1, cxpoint2):
+        if ind1[i] != ind2[i]:
+            record(ind1, i, ind1[i])
+            record(ind2, i, ind2[i])
+            ind1[i], ind2[i] = ind2[i], ind1[i]
+
+    return ind1, ind2
+
+def mutFlipBit(individual, indpb):
+    track(individual)
+    for i in range(len(individual)):
+        if random.random() < indpb:
+            record(individual, i, individual[i])
+            individual[i] = type(individual[i])(not individual[i])
+
+    return individual,
+
+
+class DeltaEvaluation(object):
+
+    # gene(index, value) is the term of one gene in the objective
+    def __init__(self, gene):
+        self.gene = gene
+        self.full = 0
+        self.deltas = 0
+
+    # wraps the full fitness function, returning a fitness tuple
+    def __call__(self, evaluate):
+
+        @functools.wraps(evaluate)
+        def incremental(individual, *args, **kwargs):
+
+            changes = getattr(individual, "changes", None)
+            if changes is None:
+                self.full += 1
+                values = tuple(evaluate(individual, *args, **kwargs))
+            else:
+                self.deltas += 1
+                value = individual.base[0]
+                for i, old in changes.items():
+                    value += self.gene(i, individual[i]) - self.gene(i, old)
+                values = (value,)
+
+            # the next changes are relative to this evaluation
+            individual.changes = None
+            return values
+
+        return incremental
+
+    def __str__(self):
+        return "{} full evaluations, {} delta evaluations".format(self.full, self.deltas)
@@ -0,0 +1,74 @@
+"""
+Vectorised differential evolution
+- Framework: DEAP (toolbox), NumPy
+
+Like realcoded.py the population is one (n, dim) float matrix inside the box
+[bound_l, bound_u] with its fitness values in an (n,) array. Each generation
+every target vector x_i gets one trial vector, all of them built at once:
+
+    deRand1Bin          v_i = x_r1 + f * (x_r2 - x_r3)
+    deCurrentToBest1Bin v_i = x_i + f * (x_best - x_i) + f * (x_r1 - x_r2)
+
+with r1, r2, r3 distinct rows other than i. The trial takes each coordinate
+from v_i with probability cr, and at least one (binomial crossover), and is
+clipped back into the bounds. The whole trial matrix is the batch to evaluate,
+then selReplace keeps every trial that is at least as good as its target:
+
+    toolbox.register("trial", differential.deRand1Bin, f=0.5, cr=0.9,
+                     bound_l=0.0, bound_u=1.0)
+    toolbox.register("select", differential.selReplace, weight=-1.0)
+
+    trials = toolbox.trial(pop, fitness, generator=generator)
+    toolbox.select(pop, fitness, trials, toolbox.evaluate(trials))
+
+weight=-1.0 minimises, as for realcoded.selTournament.
+"""
+import numpy as np
+
+import realcoded
+
+generate = realcoded.generate
+
+# k distinct row indices for each row of a population of n, none of them the
+# row itself. The j-th index is drawn from the n - 1 - j rows not taken yet and
+# shifted up past each taken row at or below it. Keeping the taken rows sorted
+# makes this O(n * k^2 log k), linear in n for the k <= 3 donors used here
+def distinctRows(n, k, generator):
+    if n <= k:
+        raise ValueError("differential evolution needs more than %i individuals" % k)
+    taken = np.arange(n)[:, np.newaxis]
+    rows = np.empty((k, n), dtype=np.intp)
+    for j in range(k):
+        r = generator.integers(0, n - 1 - j, n)
+        for column in range(j + 1):
+            r += r >= taken[:, column]
+        rows[j] = r
+        taken = np.sort(np.column_stack((taken, r)), axis=1)
+    return rows
+
+# takes the coordinates of the mutants with probability cr, and the one at a
+# random index j_rand of every row
+def cxBinomial(population, mutants, cr, generator):
+    n, dim = population.shape
+    take = generator.random((n, dim)) < cr
+    take[np.arange(n), generator.integers(0, dim, n)] = True
+    return np.where(take, mutants, population)
+
+def deRand1Bin(population, fitness, f, cr, bound_l, bound_u, generator):
+    r1, r2, r3 = distinctRows(len(population), 3, generator)
+    mutants = population[r1] + f * (population[r2] - population[r3])
+    return np.clip(cxBinomial(population, mutants, cr, generator), bound_l, bound_u)
+
+def deCurrentToBest1Bin(population, fitness, f, cr, bound_l, bound_u, generator, weight=1.0):
+    r1, r2 = distinctRows(len(population), 2, generator)
+    best = population[np.argmax(weight * np.asarray(fitness))]
+    mutants = population + f * (best - population) + f * (population[r1] - population[r2])
+    return np.clip(cxBinomial(population, mutants, cr, generator), bound_l, bound_u)
+
+# replaces in place every target whose trial is at least as good, returns the
+# mask of the replaced rows
+def selReplace(population, fitness, trials, trial_fitness, weight=1.0):
+    better = weight * np.asarray(trial_fitness) >= weight * fitness
+    population[better] = trials[better]
+    fitness[better] = trial_fitness[better]
+    return better
@@ -0,0 +1,256 @@
+"""
+Island-model Genetic Algorithm for the One Max Problem
+
+Instead of one population evolved in lockstep, every process evolves its own
+deme (an island) with the algorithm of onemax_serial.py. The islands are
+connected in a ring: every MIGRATION_FREQ generations an island sends copies of
+its MIGRANTS best individuals to the next island without waiting for them to be
+received, and at the end of every generation it merges whatever migrants have
+arrived from the previous island, without waiting for any. Migrants replace the
+worst individuals of the deme if they are better.
+
+When an island is done (it has found the optimum or reached NGEN) it tells the
+next island that nothing more is coming, and takes in the migrants still on
+their way to it, so that no message is left behind.
+
+Backends:
+    - "multiprocessing": ISLANDS processes on this machine, linked by queues
+    - "mpi": one island per MPI rank, across nodes, with nonblocking sends
+
+Each island draws from its own random stream, but migrants arrive whenever they
+arrive, so runs with more than one island are not reproducible.
+
+Run with e.g.
+
+    python onemax_island.py                         (BACKEND = "multiprocessing")
+    mpirun -n 4 python onemax_island.py             (BACKEND = "mpi")
+"""
+import multiprocessing
+import os
+import queue
+import random
+import sys
+
+from deap import base
+from deap import creator
+from deap import tools
+
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import seeding
+
+SEED = 64
+BACKEND = "multiprocessing"     # "multiprocessing" or "mpi"
+ISLANDS = 4                     # Number of processes with multiprocessing
+DEME = 75                       # Individuals per island
+NGEN = 1000
+MIGRATION_FREQ = 5              # Generations between migrations
+MIGRANTS = 2                    # Individuals sent per migration
+MIGRATION_TAG = 7
+
+if BACKEND == "mpi":
+    from mpi4py import MPI
+
+# After they've been created, all our defined classes will be part of the
+# creator container
+creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+creator.create("Individual", list, fitness=creator.FitnessMax)
+
+toolbox = base.Toolbox()
+# Attribute generator
+toolbox.register("attr_bool", random.randint, 0, 1)
+# Structure initialisers
+toolbox.register("individual", tools.initRepeat, creator.Individual,
+                 toolbox.attr_bool, 100)
+toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+
+def evalOneMax(individual):
+    # returns an iterable of equal length to the no. of objectives/weights
+    return sum(individual),
+
+toolbox.register("evaluate", evalOneMax)
+toolbox.register("mate", tools.cxTwoPoint)
+toolbox.register("mutate", tools.mutFlipBit, indpb=0.05)
+toolbox.register("select", tools.selTournament, tournsize=3)
+
+# ------------------------------Migration-------------------------------------
+
+# Both kinds of migration send lists of individuals to the next island, and
+# None once the island is done
+
+
+class QueueMigration(object):
+
+    def __init__(self, inbox, outbox):
+        self.inbox = inbox
+        self.outbox = outbox
+        self.done = False
+
+    # put never blocks, a feeder thread sends the migrants
+    def emigrate(self, migrants):
+        self.outbox.put(migrants)
+
+    # the migrants that have arrived, without waiting for any
+    def immigrate(self):
+        arrived = []
+        while not self.done:
+            try:
+                migrants = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if migrants is None:
+                self.done = True
+            else:
+                arrived.append(migrants)
+        return arrived
+
+    def finish(self):
+        self.emigrate(None)
+        while not self.done:
+            self.done = self.inbox.get() is None
+
+
+class MPIMigration(object):
+
+    # a single rank has no one to migrate to
+    def __init__(self, comm):
+        self.comm = comm
+        rank = comm.Get_rank()
+        size = comm.Get_size()
+        self.destination = (rank + 1) % size
+        self.source = (rank - 1) % size
+        self.sends = []
+        self.done = size == 1
+
+    def emigrate(self, migrants):
+        if self.comm.Get_size() == 1:
+            return
+        self.sends.append(self.comm.isend(migrants, dest=self.destination, tag=MIGRATION_TAG))
+
+        # forget the sends that have gone through
+        self.sends = [request for request in self.sends if not request.Test()]
+
+    # receives only the messages that iprobe says are there, so never blocks
+    def immigrate(self):
+        arrived = []
+        while not self.done and self.comm.iprobe(source=self.source, tag=MIGRATION_TAG):
+            migrants = self.comm.recv(source=self.source, tag=MIGRATION_TAG)
+            if migrants is None:
+                self.done = True
+            else:
+                arrived.append(migrants)
+        return arrived
+
+    def finish(self):
+        self.emigrate(None)
+        while not self.done:
+            self.done = self.comm.recv(source=self.source, tag=MIGRATION_TAG) is None
+        MPI.Request.Waitall(self.sends)
+        self.sends = []
+
+# replaces the worst individuals of the deme with the migrants that are better
+def merge(pop, migrants):
+    worst = sorted(range(len(pop)), key=lambda i: pop[i].fitness.values)
+    for i, migrant in zip(worst, migrants):
+        if migrant.fitness.values > pop[i].fitness.values:
+            pop[i] = migrant
+
+# -----------------------------Main Algorithm--------------------------------
+
+# evolves one island, returns its index, the number of generations and its best
+# individual
+def evolve(island, migration):
+
+    CXPB, MUTPB = 0.5, 0.2
+
+    seeding.seedStream(SEED, island)
+    pop = toolbox.population(n=DEME)
+
+    # Evaluate the entire population
+    fitnesses = list(map(toolbox.evaluate, pop))
+    for ind, fit in zip(pop, fitnesses):
+        ind.fitness.values = fit
+
+    fits = [ind.fitness.values[0] for ind in pop]
+    g = 0
+
+    while max(fits) < 100 and g < NGEN:
+        g = g + 1
+
+        # Select the next generation individuals
+        offspring = toolbox.select(pop, len(pop))
+        offspring = list(map(toolbox.clone, offspring))
+
+        # Apply crossover and mutation on the offspring
+        for child1, child2 in zip(offspring[::2], offspring[1::2]):
+            if random.random() < CXPB:
+                toolbox.mate(child1, child2)
+                del child1.fitness.values
+                del child2.fitness.values
+
+        for mutant in offspring:
+            if random.random() < MUTPB:
+                toolbox.mutate(mutant)
+                del mutant.fitness.values
+
+        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+        fitnesses = map(toolbox.evaluate, invalid_ind)
+        for ind, fit in zip(invalid_ind, fitnesses):
+            ind.fitness.values = fit
+
+        pop[:] = offspring
+
+        # exchange the best individuals with the neighbours
+        if g % MIGRATION_FREQ == 0:
+            migration.emigrate(list(map(toolbox.clone, tools.selBest(pop, MIGRANTS))))
+        for migrants in migration.immigrate():
+            merge(pop, migrants)
+
+        fits = [ind.fitness.values[0] for ind in pop]
+
+    migration.finish()
+    return island, g, tools.selBest(pop, 1)[0]
+
+def report(results):
+    for island, g, best in sorted(results):
+        print("Island %i: %i generations, best %s" % (island, g, best.fitness.values))
+
+    best_ind = tools.selBest([best for _, _, best in results], 1)[0]
+    print("Best individual is %s, %s" % (best_ind, best_ind.fitness.values))
+
+def runIsland(island, inbox, outbox, results):
+    results.put(evolve(island, QueueMigration(inbox, outbox)))
+
+def mainMultiprocessing():
+
+    # island n receives from its own inbox and sends to the inbox of n + 1
+    inboxes = [multiprocessing.Queue() for _ in range(ISLANDS)]
+    results = multiprocessing.Queue()
+
+    processes = []
+    for n in range(ISLANDS):
+        process = multiprocessing.Process(target=runIsland,
+                                          args=(n, inboxes[n], inboxes[(n + 1) % ISLANDS], results))
+        process.start()
+        processes.append(process)
+
+    collected = [results.get() for _ in range(ISLANDS)]
+    for process in processes:
+        process.join()
+
+    report(collected)
+
+def mainMPI():
+
+    comm = MPI.COMM_WORLD
+    result = evolve(comm.Get_rank(), MPIMigration(comm))
+
+    results = comm.gather(result, root=0)
+    if comm.Get_rank() == 0:
+        report(results)
+
+if __name__ == "__main__":
+    if BACKEND == "mpi":
+        mainMPI()
+    else:
+        mainMultiprocessing()
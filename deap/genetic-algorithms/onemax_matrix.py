@@ -0,0 +1,92 @@
+"""
+The One Max Problem with the whole population as one bit matrix.
+
+Same generational algorithm as onemax_serial.py: tournament selection,
+two-point crossover on consecutive pairs of offspring, bit-flip mutation, and
+only the changed offspring are evaluated again. Every step works on the
+(POPULATION, N_BITS) uint8 matrix at once with the operators from bitmatrix.py,
+so the run scales to e.g. 10^4 individuals of 10^5 bits.
+
+With PACKED = True the genomes are packed 64 bits to a uint64 word with the
+operators from packed.py, which behave the same in 8 times less memory.
+"""
+import os
+import sys
+
+import numpy as np
+
+from deap import base
+
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import bitmatrix
+import packed
+import recorder
+import seeding
+
+SEED = 64
+N_BITS = 100
+POPULATION = 300
+NGEN = 1000
+CXPB, MUTPB = 0.5, 0.2
+PACKED = False      # 64 bits per uint64 word instead of one per byte
+
+toolbox = base.Toolbox()
+toolbox.register("population", bitmatrix.generate, n_bits=N_BITS)
+toolbox.register("evaluate", bitmatrix.evalOneMax)
+toolbox.register("mate", bitmatrix.cxTwoPoint, cxpb=CXPB)
+toolbox.register("mutate", bitmatrix.mutFlipBit, mutpb=MUTPB, indpb=0.05)
+toolbox.register("select", bitmatrix.selTournament, tournsize=3)
+
+if PACKED:
+    toolbox.register("population", packed.generate, n_bits=N_BITS)
+    toolbox.register("evaluate", packed.evalOneMax)
+    toolbox.register("mate", packed.cxTwoPoint, n_bits=N_BITS, cxpb=CXPB)
+    toolbox.register("mutate", packed.mutFlipBit, n_bits=N_BITS, mutpb=MUTPB, indpb=0.05)
+    toolbox.register("decode", packed.unpack, n_bits=N_BITS)
+else:
+    toolbox.register("decode", np.asarray)
+
+def main():
+
+    generator = seeding.streamGenerator(SEED, 0)
+    pop = toolbox.population(POPULATION, generator=generator)
+
+    print("Start of evolution")
+
+    # Evaluate the entire population
+    fitness = toolbox.evaluate(pop)
+    g = 0
+
+    stats = recorder.Recorder(columns=["gen"])
+    stats.record(fitness, gen=g)
+
+    while stats.latest["max"] < N_BITS and g < NGEN:
+        g = g + 1
+        print("-- Generation %i --" % g)
+
+        # Select the next generation individuals, indexing makes the copies
+        chosen = toolbox.select(fitness, len(pop), generator=generator)
+        offspring = pop[chosen]
+        fitness = fitness[chosen]
+
+        # Apply crossover and mutation on the offspring
+        invalid = toolbox.mate(offspring, generator=generator)
+        invalid |= toolbox.mutate(offspring, generator=generator)
+
+        fitness[invalid] = toolbox.evaluate(offspring[invalid])
+
+        pop = offspring
+        stats.record(fitness, gen=g)
+
+        print("  Min %s" % stats.latest["min"])
+        print("  Max %s" % stats.latest["max"])
+        print("  Avg %s" % stats.latest["avg"])
+        print("  Std %s" % stats.latest["std"])
+
+    best = np.argmax(fitness)
+    print("Best individual is %s, (%s,)" % (toolbox.decode(pop[best]), fitness[best]))
+    return pop, fitness
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 """
-SCOOP provides implementation for parallel distribution across cpu's
+MPI master/worker evaluation for the One Max Problem
 
 Using DEAP, we are going to solve the One Max Problem using a Genetic Algorithm.
 
@@ -11,18 +11,54 @@ consisting of integer vectors randomly filled with 0 and 1.
 We want our population to evolve until one of its members contains only
 1 and no 0's anymore
 
+Rank 0 runs the algorithm of onemax_serial.py (selection, crossover, mutation,
+stats, checkpoints) and every rank, rank 0 included, evaluates a share of the
+offspring. Each generation the unevaluated individuals are packed 64 genes to a
+uint64 word (packed.py) and sent out in rounds of at most CHUNK_SIZE
+individuals per rank:
+
+    - rank 0 broadcasts the number of individuals in the round, 0 to stop
+    - Scatterv sends each rank its rows of the packed genomes
+    - Gatherv collects the fitness values into one contiguous array on rank 0
+
+With a cheap objective like OneMax the cost of a round is mostly message
+latency, so CHUNK_SIZE should be large enough that a whole generation takes one
+or a few rounds. Only rank 0 draws random numbers, so the run is the same for
+any number of ranks.
+
 This is written with guidance from:
 http://deap.readthedocs.io/en/master/examples/ga_onemax.html
 https://github.com/DEAP/deap/blob/master/examples/ga/onemax.py
+
+Run with e.g.
+
+    mpirun -n 4 python onemax_parallel.py
 """
+import os
 import random
+import sys
+import traceback
+
+import numpy as np
 
-from scoop import futures
 from deap import base
 from deap import creator
 from deap import tools
 from mpi4py import MPI
 
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import checkpoint
+import packed
+import recorder
+import seeding
+
+SEED = 64
+CHECKPOINT = "onemax_parallel.ckpt"
+CHECKPOINT_FREQ = 10
+N_BITS = 100
+CHUNK_SIZE = 256    # Most individuals sent to each rank per round
+
 # After they've been created, all our defined classes will be part of the
 # creator container
 creator.create("FitnessMax", base.Fitness, weights=(1.0,))
@@ -33,7 +69,7 @@ toolbox = base.Toolbox()
 toolbox.register("attr_bool", random.randint, 0, 1)
 # Structure initialisers
 toolbox.register("individual", tools.initRepeat, creator.Individual,
-                 toolbox.attr_bool, 100)
+                 toolbox.attr_bool, N_BITS)
 toolbox.register("population", tools.initRepeat, list, toolbox.individual)
 
 def evalOneMax(individual):
@@ -44,36 +80,106 @@ toolbox.register("evaluate", evalOneMax)
 toolbox.register("mate", tools.cxTwoPoint)
 toolbox.register("mutate", tools.mutFlipBit, indpb=0.05)
 toolbox.register("select", tools.selTournament, tournsize=3)
-toolbox.register("map", futures.map)
 
-def main():
+# ------------------------------Communication---------------------------------
+
+# the number of individuals evaluated by each rank, spreading any remainder over
+# the first ranks
+def chunkSizes(n, size):
+    sizes = np.full(size, n // size)
+    sizes[:n % size] += 1
+    return sizes
+
+# evaluates the rows of packed genomes this rank received
+def evalChunk(words):
+    return np.array([toolbox.evaluate(genome)[0] for genome in packed.unpack(words, N_BITS)],
+                    dtype=float)
+
+# one round of evaluation, called on every rank. On rank 0, words holds the
+# packed genomes of the round and their fitness values are written to fitness.
+# Returns False when rank 0 sent an empty round, i.e. the run is over
+def evaluateRound(comm, words=None, fitness=None):
 
-    comm = MPI.COMM_WORLD
     rank = comm.Get_rank()
-    size = comm.Get_size()
+    n_words = packed.nwords(N_BITS)
 
+    header = np.zeros(1, dtype=np.int64)
     if rank == 0:
+        header[0] = len(words)
+    comm.Bcast(header, root=0)
+    if header[0] == 0:
+        return False
+
+    counts = chunkSizes(int(header[0]), comm.Get_size())
+    displs = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    chunk = np.empty((counts[rank], n_words), dtype=np.uint64)
+    send = [words, counts * n_words, displs * n_words, MPI.UINT64_T] if rank == 0 else None
+    comm.Scatterv(send, chunk, root=0)
+
+    values = evalChunk(chunk)
+    receive = [fitness, counts, displs, MPI.DOUBLE] if rank == 0 else None
+    comm.Gatherv(values, receive, root=0)
+    return True
 
+# evaluates the individuals across all ranks in rounds of at most CHUNK_SIZE
+# individuals per rank, called on rank 0 only
+def evaluateDistributed(comm, individuals):
 
-    random.seed(64)
+    if not individuals:
+        return
 
-    pop = toolbox.population(n=300)
+    words = packed.fromPopulation(individuals)
+    fitness = np.empty(len(individuals))
+
+    step = CHUNK_SIZE * comm.Get_size()
+    for start in range(0, len(individuals), step):
+        stop = min(start + step, len(individuals))
+        evaluateRound(comm, words[start:stop], fitness[start:stop])
+
+    for ind, fit in zip(individuals, fitness):
+        ind.fitness.values = float(fit),
+
+# sends the empty round that stops the workers
+def stopWorkers(comm):
+    evaluateRound(comm, np.empty((0, packed.nwords(N_BITS)), dtype=np.uint64))
+
+# -----------------------------Main Algorithm--------------------------------
+# the algorithm of onemax_serial.py, run on rank 0 only
+def evolve(comm):
 
     CXPB, MUTPB = 0.5, 0.2
 
-    print("Start of evolution")
+    # carry on from the last checkpoint if there is one
+    params = {"population": 300, "n_bits": N_BITS, "seed": SEED}
+    checkpointer = checkpoint.Checkpointer(CHECKPOINT, frequency=CHECKPOINT_FREQ, params=params)
+    state = checkpointer.load()
+
+    if state is None:
+        seeding.seedAll(SEED)
+
+        pop = toolbox.population(n=300)
+
+        print("Start of evolution")
+
+        # Evaluate the entire population
+        evaluateDistributed(comm, pop)
 
-    # Evaluate the entire population
-    fitnesses = list(map(toolbox.evaluate, pop))
-    for ind, fit in zip(pop, fitnesses):
-        ind.fitness.values = fit
+        g = 0
 
-    # Extracting all the fitnesses of
-    fits = [ind.fitness.values[0] for ind in pop]
+        # Recording the fitnesses of the population
+        stats = recorder.Recorder(columns=["gen"])
+        stats.record(recorder.fitnessArray(pop), gen=g)
 
-    g = 0
+    else:
+        pop = state["population"]
+        stats = state["stats"]
+        g = state["gen"]
+        random.setstate(state["random"])
 
-    while max(fits) < 100 and g < 1000:
+        print("Resuming evolution from generation %i" % g)
+
+    while stats.latest["max"] < N_BITS and g < 1000:
         g = g + 1
         print("-- Generation %i --" % g)
 
@@ -94,23 +200,44 @@ def main():
                 del mutant.fitness.values
 
         invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-        fitnesses = map(toolbox.evaluate, invalid_ind)
-        for ind, fit in zip(invalid_ind, fitnesses):
-            ind.fitness.values = fit
+        evaluateDistributed(comm, invalid_ind)
 
         pop[:] = offspring
 
-        fits = [ind.fitness.values[0] for ind in pop]
+        stats.record(recorder.fitnessArray(pop), gen=g)
+
+        print("  Min %s" % stats.latest["min"])
+        print("  Max %s" % stats.latest["max"])
+        print("  Avg %s" % stats.latest["avg"])
+        print("  Std %s" % stats.latest["std"])
+
+        if checkpointer.due(g):
+            checkpointer.save({"gen": g, "population": pop, "stats": stats,
+                               "random": random.getstate()})
+
+    checkpointer.finish()
+    return pop
 
-        length = len(pop)
-        mean = sum(fits) / length
-        sum2 = sum(x*x for x in fits)
-        std = abs(sum2 / length - mean**2)**0.5
+def main():
+
+    comm = MPI.COMM_WORLD
 
-        print("  Min %s" % min(fits))
-        print("  Max %s" % max(fits))
-        print("  Avg %s" % mean)
-        print("  Std %s" % std)
+    # the other ranks only evaluate, until rank 0 is done
+    if comm.Get_rank() != 0:
+        while evaluateRound(comm):
+            pass
+        return
+
+    # the other ranks wait in evaluateRound until rank 0 stops them, possibly
+    # in the middle of a round, so an error on rank 0 ends the whole job
+    # rather than leaving them waiting forever
+    try:
+        pop = evolve(comm)
+    except BaseException:
+        traceback.print_exc()
+        sys.stderr.flush()
+        comm.Abort(1)
+    stopWorkers(comm)
 
     best_ind = tools.selBest(pop, 1)[0]
     print("Best individual is %s, %s" % (best_ind, best_ind.fitness.values))
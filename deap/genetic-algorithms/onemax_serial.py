@@ -13,12 +13,35 @@ This is written with guidance from:
 http://deap.readthedocs.io/en/master/examples/ga_onemax.html
 https://github.com/DEAP/deap/blob/master/examples/ga/onemax.py
 """
+import os
 import random
+import sys
 
 from deap import base
 from deap import creator
 from deap import tools
 
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import cache
+import checkpoint
+import delta
+import profiling
+import recorder
+import seeding
+import steadystate
+
+SEED = 64
+CHECKPOINT = "onemax_serial.ckpt"
+CHECKPOINT_FREQ = 10
+DELTA = True        # Evaluate offspring from the genes their parents changed
+CACHE_SIZE = None   # Genomes whose fitness is remembered, e.g. 4096
+CACHE_PATH = None   # Keeps the cache on disk across runs, e.g. "onemax_serial.cache"
+PROFILE = None      # Trace file for per-generation timings, e.g. "onemax_serial.trace.jsonl"
+STEADY_STATE = False    # Breed a child whenever an evaluation finishes, see steadystate.py
+WORKERS = None          # Processes of the steady-state pool, None for one per CPU
+INFLIGHT = 16           # Evaluations in flight at a time in the steady-state mode
+
 # After they've been created, all our defined classes will be part of the
 # creator container
 creator.create("FitnessMax", base.Fitness, weights=(1.0,))
@@ -36,76 +59,145 @@ def evalOneMax(individual):
     # returns an iterable of equal length to the no. of objectives/weights
     return sum(individual),
 
-toolbox.register("evaluate", evalBbcomp)
+toolbox.register("evaluate", evalOneMax)
 toolbox.register("mate", tools.cxTwoPoint)
 toolbox.register("mutate", tools.mutFlipBit, indpb=0.05)
 toolbox.register("select", tools.selTournament, tournsize=3)
 
-def evalBbcomp(individual):
-    value = 0
-    bbcomp.evaluate(individual, value)
-    return value
+# OneMax is a sum over the genes, so an offspring's fitness is its parent's plus
+# the difference in the genes that crossover and mutation flipped. The
+# steady-state workers evaluate copies of the children, so neither the delta
+# nor the cache below apply there
+delta_evaluation = delta.DeltaEvaluation(delta.identity)
+if DELTA and not STEADY_STATE:
+    toolbox.register("mate", delta.cxTwoPoint)
+    toolbox.register("mutate", delta.mutFlipBit, indpb=0.05)
+    toolbox.decorate("evaluate", delta_evaluation)
+
+# duplicate genomes are looked up instead of evaluated again, worth it for
+# objectives that cost more than hashing the genome
+genome_cache = None
+if CACHE_SIZE is not None and not STEADY_STATE:
+    genome_cache = cache.GenomeCache(maxsize=CACHE_SIZE, pack=True, path=CACHE_PATH)
+    toolbox.decorate("evaluate", genome_cache)
+
+# times every phase of a generation if PROFILE is set, does nothing otherwise
+profiler = profiling.profiler(PROFILE)
 
 def main():
-    random.seed(64)
-
-    pop = toolbox.population(n=300)
 
     CXPB, MUTPB = 0.5, 0.2
 
-    print("Start of evolution")
+    # carry on from the last checkpoint if there is one
+    params = {"population": 300, "n_bits": 100, "delta": DELTA, "seed": SEED}
+    checkpointer = checkpoint.Checkpointer(CHECKPOINT, frequency=CHECKPOINT_FREQ, params=params)
+    state = checkpointer.load()
+
+    if state is None:
+        seeding.seedAll(SEED)
 
-    # Evaluate the entire population
-    fitnesses = list(map(toolbox.evaluate, pop))
-    for ind, fit in zip(pop, fitnesses):
-        ind.fitness.values = fit
+        pop = toolbox.population(n=300)
 
-    # Extracting all the fitnesses of
-    fits = [ind.fitness.values for ind in pop]
+        print("Start of evolution")
 
-    g = 0
+        # Evaluate the entire population
+        fitnesses = list(map(toolbox.evaluate, pop))
+        for ind, fit in zip(pop, fitnesses):
+            ind.fitness.values = fit
 
-    while max(fits) < 100 and g < 1000:
+        g = 0
+
+        # Recording the fitnesses of the population
+        stats = recorder.Recorder(columns=["gen"])
+        stats.record(recorder.fitnessArray(pop), gen=g)
+
+    else:
+        pop = state["population"]
+        stats = state["stats"]
+        g = state["gen"]
+        random.setstate(state["random"])
+
+        print("Resuming evolution from generation %i" % g)
+
+    while stats.latest["max"] < 100 and g < 1000:
         g = g + 1
         print("-- Generation %i --" % g)
 
         # Select the next generation individuals
-        offspring = toolbox.select(pop, len(pop))
-        offspring = list(map(toolbox.clone, offspring))
+        with profiler.phase("select"):
+            offspring = toolbox.select(pop, len(pop))
+        with profiler.phase("clone"):
+            offspring = list(map(toolbox.clone, offspring))
 
         # Apply crossover and mutation on the offspring
-        for child1, child2 in zip(offspring[::2], offspring[1::2]):
-             if random.random() < CXPB:
-                 toolbox.mate(child1, child2)
-                 del child1.fitness.values
-                 del child2.fitness.values
-
-        for mutant in offspring:
-            if random.random() < MUTPB:
-                toolbox.mutate(mutant)
-                del mutant.fitness.values
+        with profiler.phase("vary"):
+            for child1, child2 in zip(offspring[::2], offspring[1::2]):
+                 if random.random() < CXPB:
+                     toolbox.mate(child1, child2)
+                     del child1.fitness.values
+                     del child2.fitness.values
+
+            for mutant in offspring:
+                if random.random() < MUTPB:
+                    toolbox.mutate(mutant)
+                    del mutant.fitness.values
 
         invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-        fitnesses = map(toolbox.evaluate, invalid_ind)
-        for ind, fit in zip(invalid_ind, fitnesses):
-            ind.fitness.values = fit
+        with profiler.phase("evaluate"):
+            fitnesses = map(toolbox.evaluate, invalid_ind)
+            for ind, fit in zip(invalid_ind, fitnesses):
+                ind.fitness.values = fit
+        profiler.count("evals", len(invalid_ind))
 
         pop[:] = offspring
 
-        fits = [ind.fitness.values for ind in pop]
+        with profiler.phase("stats"):
+            stats.record(recorder.fitnessArray(pop), gen=g)
+        profiler.record(g)
+
+        print("  Min %s" % stats.latest["min"])
+        print("  Max %s" % stats.latest["max"])
+        print("  Avg %s" % stats.latest["avg"])
+        print("  Std %s" % stats.latest["std"])
 
-        length = len(pop)
-        mean = sum(fits) / length
-        sum2 = sum(x*x for x in fits)
-        std = abs(sum2 / length - mean**2)**0.5
+        if checkpointer.due(g):
+            checkpointer.save({"gen": g, "population": pop, "stats": stats,
+                               "random": random.getstate()})
 
-        print("  Min %s" % min(fits))
-        print("  Max %s" % max(fits))
-        print("  Avg %s" % mean)
-        print("  Std %s" % std)
+    checkpointer.finish()
 
-    best_ind = tools.selBest(pop, 1)
+    best_ind = tools.selBest(pop, 1)[0]
     print("Best individual is %s, %s" % (best_ind, best_ind.fitness.values))
 
+# the steady-state GA on a pool of processes, for the same number of
+# evaluations as 1000 generations at most
+def mainSteadyState():
+
+    CXPB, MUTPB = 0.5, 0.2
+
+    seeding.seedAll(SEED)
+    pop = toolbox.population(n=300)
+
+    print("Start of evolution")
+
+    stats = recorder.Recorder(columns=["gen", "evals"])
+    pool = steadystate.ProcessPool(WORKERS)
+    pop, evals = steadystate.eaSteadyState(pop, toolbox, pool, CXPB, MUTPB,
+                                           nevals=1000 * len(pop), inflight=INFLIGHT, stats=stats,
+                                           stop=lambda pop: max(recorder.fitnessArray(pop)) >= 100)
+    pool.close()
+
+    best_ind = tools.selBest(pop, 1)[0]
+    print("Best individual is %s, %s after %i evaluations" % (best_ind, best_ind.fitness.values, evals))
+
 if __name__ == "__main__":
-    main()
+    if STEADY_STATE:
+        mainSteadyState()
+    else:
+        main()
+    if DELTA and not STEADY_STATE:
+        print(delta_evaluation)
+    if genome_cache is not None:
+        print(genome_cache)
+        genome_cache.close()
+    profiler.close()
@@ -0,0 +1,131 @@
+"""
+Bit-packed binary genomes
+
+A genome of n_bits bits is stored in ceil(n_bits / 64) uint64 words, bit i of
+the genome being bit i % 64 of word i // 64, and the unused bits of the last
+word always 0. Compared to the uint8 matrix of bitmatrix.py this takes 8 times
+less memory, and 8 times less to pickle when genomes are sent to workers.
+
+The operators have the signatures of their bitmatrix.py counterparts, plus the
+number of bits, and work on a (n, words) population matrix:
+
+    cxTwoPoint      swaps the segment [point1, point2) of each mating pair with
+                    a word mask: a ^= (a ^ b) & mask, b ^= (a ^ b) & mask
+    mutFlipBit      xors each mutated row with a packed mask of random flips
+    evalOneMax      popcount of every row, with np.bitwise_count when NumPy
+                    has it and a byte lookup table otherwise
+
+There is no packed selTournament: it only looks at the fitness values, so
+bitmatrix.selTournament works on either kind of population.
+
+Converters to and from the creator.Individual lists of the other scripts:
+
+    words = fromIndividual(individual)
+    individual = toIndividual(words, n_bits, creator.Individual)
+"""
+import numpy as np
+
+from bitmatrix import blocks
+
+WORD = 64
+ONE = np.uint64(1)
+ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# the number of set bits of every byte value, for NumPy versions without
+# np.bitwise_count
+POPCOUNT_TABLE = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+def nwords(n_bits):
+    return (n_bits + WORD - 1) // WORD
+
+# words with the lowest k bits set, for every k in 0..64
+def ones(k):
+    k = np.asarray(k, dtype=np.uint64)
+    return np.where(k >= WORD, ALL, (ONE << np.minimum(k, WORD - 1)) - ONE)
+
+# packs the 0/1 values along the last axis of bits into uint64 words
+def pack(bits):
+    bits = np.asarray(bits, dtype=np.uint8)
+    n_bytes = nwords(bits.shape[-1]) * 8
+    packed = np.packbits(bits, axis=-1, bitorder="little")
+    padding = [(0, 0)] * (bits.ndim - 1) + [(0, n_bytes - packed.shape[-1])]
+    return np.ascontiguousarray(np.pad(packed, padding)).view("<u8").astype(np.uint64, copy=False)
+
+# the first n_bits bits along the last axis of words as 0/1 uint8 values
+def unpack(words, n_bits):
+    words = np.ascontiguousarray(words, dtype="<u8")
+    return np.unpackbits(words.view(np.uint8), axis=-1, count=n_bits, bitorder="little")
+
+def fromIndividual(individual):
+    return pack(individual)
+
+def toIndividual(words, n_bits, cls=list):
+    return cls(unpack(words, n_bits).tolist())
+
+def fromPopulation(pop):
+    return pack(np.array(pop, dtype=np.uint8))
+
+def toPopulation(words, n_bits, cls=list):
+    return [cls(row) for row in unpack(words, n_bits).tolist()]
+
+# generates a population of n random genomes of n_bits bits
+def generate(n, n_bits, generator):
+    words = generator.integers(0, 1 << WORD, (n, nwords(n_bits)), dtype=np.uint64)
+    words[:, -1] &= ones(n_bits - (nwords(n_bits) - 1) * WORD)
+    return words
+
+# the number of set bits of every genome, works on one genome or a matrix
+def popcount(words):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    words = np.ascontiguousarray(words)
+    return POPCOUNT_TABLE[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+def evalOneMax(population):
+    return popcount(population)
+
+# swaps the bits [point1, point2) between the rows of each mating pair, with
+# 1 <= point1 < point2 <= n_bits as in tools.cxTwoPoint
+def cxTwoPoint(population, n_bits, cxpb, generator):
+
+    n, n_words = population.shape
+    pairs = n // 2
+    first = population[0:2 * pairs:2]
+    second = population[1:2 * pairs:2]
+
+    mates = np.flatnonzero(generator.random(pairs) < cxpb)
+    point1 = generator.integers(1, n_bits + 1, len(mates))
+    point2 = generator.integers(1, n_bits, len(mates))
+    point2 += point2 >= point1
+    point1, point2 = np.minimum(point1, point2), np.maximum(point1, point2)
+
+    # the bits of each word that fall inside the segment
+    starts = np.arange(n_words) * WORD
+    for lo, hi in blocks(0, len(mates), n_words):
+        rows = mates[lo:hi]
+        low = np.clip(point1[lo:hi, np.newaxis] - starts, 0, WORD)
+        high = np.clip(point2[lo:hi, np.newaxis] - starts, 0, WORD)
+        segment = ones(high) ^ ones(low)
+
+        swap = (first[rows] ^ second[rows]) & segment
+        first[rows] ^= swap
+        second[rows] ^= swap
+
+    changed = np.zeros(n, dtype=bool)
+    changed[2 * mates] = True
+    changed[2 * mates + 1] = True
+    return changed
+
+# flips each bit of a mutated row with probability indpb
+def mutFlipBit(population, n_bits, mutpb, indpb, generator):
+
+    n = len(population)
+    mutants = np.flatnonzero(generator.random(n) < mutpb)
+
+    for lo, hi in blocks(0, len(mutants), n_bits):
+        rows = mutants[lo:hi]
+        population[rows] ^= pack(generator.random((len(rows), n_bits)) < indpb)
+
+    changed = np.zeros(n, dtype=bool)
+    changed[mutants] = True
+    return changed
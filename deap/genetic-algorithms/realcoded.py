@@ -0,0 +1,125 @@
+"""
+Vectorised real-coded GA operators
+- Framework: DEAP (toolbox), NumPy
+
+The continuous counterpart of bitmatrix.py: the population is one (n, dim)
+float matrix inside the box [bound_l, bound_u] (scalars or per-dimension
+arrays), with the fitness values in an (n,) array next to it. Each operator
+works on the whole population at once and is the array version of the DEAP
+operator of the same name:
+
+    selTournament               tools.selTournament, returns the row indices
+                                of the winners. weight=-1.0 to minimise
+    cxSimulatedBinaryBounded    tools.cxSimulatedBinaryBounded (SBX) on the
+                                pairs of rows (0, 1), (2, 3), ... each pair
+                                mating with probability cxpb
+    mutPolynomialBounded        tools.mutPolynomialBounded on each row with
+                                probability mutpb
+    mutGaussian                 tools.mutGaussian on each row with probability
+                                mutpb, clipped back into the bounds
+
+Unlike swapping coordinates between individuals, SBX and the mutations create
+new coordinate values. The variation operators change the rows in place and
+return a boolean mask of the rows they changed, which is the batch of new
+points to evaluate, e.g. population[changed] for the BBComp client.
+
+Random numbers come from a np.random.Generator, e.g. seeding.streamGenerator.
+"""
+import numpy as np
+
+import bitmatrix
+
+# generates a population of n points drawn uniformly from the box
+def generate(n, dim, bound_l, bound_u, generator):
+    return generator.uniform(bound_l, bound_u, (n, dim))
+
+def selTournament(fitness, k, tournsize, generator, weight=1.0):
+    return bitmatrix.selTournament(weight * np.asarray(fitness), k, tournsize, generator)
+
+# the spread factor of SBX for the uniform numbers u, given the beta of the
+# distance to the bound
+def spread(beta, u, eta):
+    alpha = 2.0 - beta ** -(eta + 1.0)
+    return np.where(u <= 1.0 / alpha,
+                    (u * alpha) ** (1.0 / (eta + 1.0)),
+                    (1.0 / (2.0 - u * alpha)) ** (1.0 / (eta + 1.0)))
+
+# each coordinate of a mating pair crosses with probability 0.5, unless both
+# parents have the same value
+def cxSimulatedBinaryBounded(population, cxpb, eta, bound_l, bound_u, generator):
+
+    n, dim = population.shape
+    pairs = n // 2
+    first = population[0:2 * pairs:2]
+    second = population[1:2 * pairs:2]
+
+    mates = np.flatnonzero(generator.random(pairs) < cxpb)
+    a = first[mates]
+    b = second[mates]
+    shape = a.shape
+
+    cross = (generator.random(shape) <= 0.5) & (np.abs(a - b) > 1e-14)
+    u = generator.random(shape)
+    x1 = np.minimum(a, b)
+    x2 = np.maximum(a, b)
+    width = np.where(cross, x2 - x1, 1.0)
+
+    # the children spread around the parents, less so near the bounds
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        c1 = 0.5 * (x1 + x2 - spread(1.0 + 2.0 * (x1 - bound_l) / width, u, eta) * width)
+        c2 = 0.5 * (x1 + x2 + spread(1.0 + 2.0 * (bound_u - x2) / width, u, eta) * width)
+    c1 = np.clip(c1, bound_l, bound_u)
+    c2 = np.clip(c2, bound_l, bound_u)
+
+    swap = generator.random(shape) <= 0.5
+    first[mates] = np.where(cross, np.where(swap, c2, c1), a)
+    second[mates] = np.where(cross, np.where(swap, c1, c2), b)
+
+    changed = np.zeros(n, dtype=bool)
+    changed[2 * mates] = True
+    changed[2 * mates + 1] = True
+    return changed
+
+# each coordinate of a mutated row is perturbed with probability indpb
+def mutPolynomialBounded(population, mutpb, eta, bound_l, bound_u, indpb, generator):
+
+    n, dim = population.shape
+    mutants = np.flatnonzero(generator.random(n) < mutpb)
+    x = population[mutants]
+    shape = x.shape
+
+    mutate = generator.random(shape) < indpb
+    u = generator.random(shape)
+    width = np.asarray(bound_u) - np.asarray(bound_l)
+    delta_1 = (x - bound_l) / width
+    delta_2 = (bound_u - x) / width
+    power = 1.0 / (eta + 1.0)
+
+    low = 2.0 * u + (1.0 - 2.0 * u) * (1.0 - delta_1) ** (eta + 1.0)
+    high = 2.0 * (1.0 - u) + 2.0 * (u - 0.5) * (1.0 - delta_2) ** (eta + 1.0)
+    with np.errstate(invalid="ignore"):
+        delta_q = np.where(u < 0.5, low ** power - 1.0, 1.0 - high ** power)
+
+    x = np.where(mutate, np.clip(x + delta_q * width, bound_l, bound_u), x)
+    population[mutants] = x
+
+    changed = np.zeros(n, dtype=bool)
+    changed[mutants] = True
+    return changed
+
+# each coordinate of a mutated row gets normal(mu, sigma) noise with
+# probability indpb
+def mutGaussian(population, mutpb, mu, sigma, indpb, bound_l, bound_u, generator):
+
+    n, dim = population.shape
+    mutants = np.flatnonzero(generator.random(n) < mutpb)
+    x = population[mutants]
+    shape = x.shape
+
+    mutate = generator.random(shape) < indpb
+    noise = generator.normal(mu, sigma, shape)
+    population[mutants] = np.where(mutate, np.clip(x + noise, bound_l, bound_u), x)
+
+    changed = np.zeros(n, dtype=bool)
+    changed[mutants] = True
+    return changed
@@ -0,0 +1,142 @@
+"""
+Steady-state GA with a bounded pool of evaluations in flight
+
+In the generational loops every offspring of a generation must be evaluated
+before the next generation is bred, so with evaluations of uneven cost the
+workers wait for the slowest one. Here up to `inflight` children are evaluated
+at any time: as soon as one evaluation finishes its child is inserted into the
+population, replacing the worst individual if it is better, and another child
+is bred from the current population and submitted. The throughput is then set
+by the number of workers.
+
+    pool = steadystate.ProcessPool(workers=8)
+    pop, evals = steadystate.eaSteadyState(pop, toolbox, pool, cxpb=0.5, mutpb=0.2,
+                                           nevals=30000, inflight=16, stats=stats)
+    pool.close()
+
+Pools:
+    - ProcessPool: a concurrent.futures.ProcessPoolExecutor on this machine
+    - ScoopPool: SCOOP workers, run with python -m scoop
+
+toolbox.evaluate runs in the workers, so it must be picklable, e.g. a module
+level function but not one wrapped by delta.DeltaEvaluation. Children are bred
+in the order the evaluations finish, so runs are not reproducible.
+"""
+import concurrent.futures
+import random
+
+
+class ProcessPool(object):
+
+    def __init__(self, workers=None):
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+
+    def submit(self, function, *args):
+        return self.executor.submit(function, *args)
+
+    # waits for at least one of the futures, returns the finished ones
+    def wait(self, futures):
+        done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+        return done
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class ScoopPool(object):
+
+    def __init__(self):
+        from scoop import futures
+        self.futures = futures
+
+    def submit(self, function, *args):
+        return self.futures.submit(function, *args)
+
+    def wait(self, futures):
+        done, _ = self.futures.wait(list(futures), return_when=self.futures.FIRST_COMPLETED)
+        return done
+
+    def close(self):
+        pass
+
+# a child of two parents from the population, with crossover with probability
+# cxpb and mutation with probability mutpb. A child that neither changed is a
+# copy of its parent, so it is bred again. Needs cxpb + mutpb > 0
+def breed(population, toolbox, cxpb, mutpb):
+    while True:
+        child, other = map(toolbox.clone, toolbox.select(population, 2))
+        changed = False
+        if random.random() < cxpb:
+            toolbox.mate(child, other)
+            changed = True
+        if random.random() < mutpb:
+            toolbox.mutate(child)
+            changed = True
+        if changed:
+            del child.fitness.values
+            return child
+
+# replaces the worst individual with the child if the child is better
+def insert(population, child):
+    worst = min(range(len(population)), key=lambda i: population[i].fitness)
+    if child.fitness > population[worst].fitness:
+        population[worst] = child
+
+# evaluates the unevaluated individuals of the population, then breeds and
+# evaluates children until nevals children have been evaluated or stop(population)
+# is true. Every len(population) evaluations the fitness values are recorded
+# in stats (a recorder.Recorder with the columns "gen" and "evals") and printed
+# if verbose. Returns the population and the number of children evaluated
+def eaSteadyState(population, toolbox, pool, cxpb, mutpb, nevals, inflight,
+                  stats=None, verbose=True, stop=None):
+
+    # otherwise no child would ever change and breed would never return
+    if cxpb + mutpb <= 0:
+        raise ValueError("cxpb + mutpb must be positive, got cxpb=%s and mutpb=%s" % (cxpb, mutpb))
+
+    invalid = [ind for ind in population if not ind.fitness.valid]
+    futures = [pool.submit(toolbox.evaluate, ind) for ind in invalid]
+    for ind, future in zip(invalid, futures):
+        ind.fitness.values = future.result()
+
+    def report(evals):
+        if stats is not None:
+            stats.record([ind.fitness.values[0] for ind in population],
+                         gen=evals // len(population), evals=evals)
+            if verbose:
+                print(stats.stream)
+
+    report(0)
+
+    # the children being evaluated, by their future
+    pending = {}
+    submitted = 0
+    evals = 0
+    stopped = stop is not None and stop(population)
+
+    while not stopped and submitted < nevals and len(pending) < inflight:
+        child = breed(population, toolbox, cxpb, mutpb)
+        pending[pool.submit(toolbox.evaluate, child)] = child
+        submitted += 1
+
+    while pending:
+        for future in pool.wait(pending):
+            child = pending.pop(future)
+            child.fitness.values = future.result()
+            insert(population, child)
+
+            evals += 1
+            if evals % len(population) == 0:
+                report(evals)
+
+            # the children still in flight are inserted when they finish
+            stopped = stopped or (stop is not None and stop(population))
+            if not stopped and submitted < nevals:
+                child = breed(population, toolbox, cxpb, mutpb)
+                pending[pool.submit(toolbox.evaluate, child)] = child
+                submitted += 1
+
+    if evals % len(population) != 0:
+        report(evals)
+
+    return population, evals
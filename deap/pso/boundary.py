@@ -0,0 +1,52 @@
+"""
+Boundary handling and velocity clamping for the PSO scripts
+
+Each mode takes the positions and velocities after a move, either of a single
+particle (dim,) or of a whole swarm (n, dim), and puts every coordinate that
+left [bound_l, bound_u] back inside, in place and as whole-array operations:
+
+    clip        moves the coordinate onto the bound, and stops it there
+    reflect     bounces the coordinate off the bound and reverses its velocity
+    wrap        re-enters the coordinate from the opposite bound (periodic)
+    reinit      samples the coordinate again from uniform(bound_l, bound_u)
+                and stops it
+
+The bounds may be scalars or per-dimension arrays, np.inf leaves a side open.
+
+    toolbox.register("bound", boundary.reflect, bound_l=0, bound_u=1)
+    toolbox.register("update", swarm.updateSwarm, ..., vmax=0.2, bound=toolbox.bound)
+"""
+import numpy as np
+
+def clip(position, velocity, bound_l, bound_u, generator=None):
+    outside = (position < bound_l) | (position > bound_u)
+    np.clip(position, bound_l, bound_u, out=position)
+    velocity[outside] = 0.
+
+def reflect(position, velocity, bound_l, bound_u, generator=None):
+    below = position < bound_l
+    above = position > bound_u
+    np.subtract(2. * bound_l, position, out=position, where=below)
+    np.subtract(2. * bound_u, position, out=position, where=above)
+    below |= above
+    np.negative(velocity, out=velocity, where=below)
+
+    # a move longer than the width of the box can overshoot the other bound
+    np.clip(position, bound_l, bound_u, out=position)
+
+def wrap(position, velocity, bound_l, bound_u, generator=None):
+    width = np.asarray(bound_u) - np.asarray(bound_l)
+    outside = (position < bound_l) | (position > bound_u)
+    np.copyto(position, bound_l + np.mod(position - bound_l, width), where=outside)
+
+# generator only needs a uniform(low, high, size) method. Numbers are drawn for
+# every coordinate, so that the draws line up with a seeding.SwarmStreams
+def reinit(position, velocity, bound_l, bound_u, generator=np.random):
+    outside = (position < bound_l) | (position > bound_u)
+    samples = generator.uniform(0., 1., position.shape)
+    np.copyto(position, bound_l + samples * (np.asarray(bound_u) - bound_l), where=outside)
+    velocity[outside] = 0.
+
+# limits every velocity component to [-vmax, vmax]
+def clampVelocity(velocity, vmax):
+    np.clip(velocity, -vmax, vmax, out=velocity)
@@ -0,0 +1,61 @@
+"""
+Optimisation Test Functions
+https://en.wikipedia.org/wiki/Test_functions_for_optimization
+
+Every function is a batched kernel: it takes an (n, dim) array holding one
+position per row and returns the n fitness values in one NumPy call. The values
+are negated so that the optima are maxima, to be used with the weights=(1.0,)
+fitness in the PSO scripts.
+
+To evaluate a single individual (e.g. a creator.Particle through
+toolbox.evaluate), register evaluateIndividual with the kernel:
+
+    toolbox.register("evaluate", evaluateIndividual, kernel=rastrigin)
+
+To evaluate a whole swarm.Swarm, pass the kernel itself to swarm.evaluateSwarm.
+"""
+import numpy as np
+
+# evaluates a single individual with a batched kernel, returns a fitness tuple
+def evaluateIndividual(individual, kernel, **kwargs):
+    positions = np.asarray(individual, dtype=float).reshape(1, -1)
+    return kernel(positions, **kwargs)[0],
+
+# ----------------------------Optimisation Functions------------------------------
+
+def sphere(positions, centre=0.):
+    return -1.0 * np.sum((positions - centre) ** 2, axis=1)
+
+def rastrigin(positions):
+    sq_component = positions ** 2
+    cos_component = np.cos(2 * np.pi * positions)
+    summation = np.sum(sq_component - 10. * cos_component, axis=1)
+    return -1.0 * (10. * positions.shape[1] + summation)
+
+def ackley(positions):
+    sqrt_component = np.sqrt(np.mean(positions ** 2, axis=1))
+    cos_component = np.mean(np.cos(2 * np.pi * positions), axis=1)
+    return -1.0 * (-20. * np.exp(-0.2 * sqrt_component) - np.exp(cos_component) + np.e + 20.)
+
+def rosenbrock(positions):
+    curr = positions[:, :-1]
+    succ = positions[:, 1:]
+    summation = np.sum(100. * (succ - curr ** 2) ** 2 + (curr - 1.) ** 2, axis=1)
+    return -1.0 * summation
+
+def beale(positions):
+    #NOTE: 2 dimensions only
+    x = positions[:, 0]
+    y = positions[:, 1]
+    first = 1.5 - x + x * y
+    second = 2.25 - x + x * y ** 2
+    third = 2.625 - x + x * y ** 3
+    return -1.0 * (first ** 2 + second ** 2 + third ** 2)
+
+def bukin6(positions):
+    #NOTE: 2 dimensions only, -15 <= x <= -5, -3 <= y <= 3
+    x = positions[:, 0]
+    y = positions[:, 1]
+    sqrt_component = np.sqrt(np.abs(y - 0.01 * x ** 2))
+    abs_component = 0.01 * np.abs(x + 10)
+    return -1.0 * (100. * sqrt_component + abs_component)
@@ -44,23 +44,25 @@ PSO Algorithm:
 5) return global best
 
 """
-import operator
+import os
+import sys
 import numpy as np
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from matplotlib import cm
 
 from deap import base
-from deap import benchmarks
 from deap import creator
 from deap import tools
 
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import profiling
+import recorder
+from optimisation_functions import evaluateIndividual, sphere
+
 GMAX = 500
 DELTA = 1e-7
 EPSILON = 1e-7
 DIM = 2
+PROFILE = None      # Trace file for per-generation timings, e.g. "pso_adjusted.trace.jsonl"
 
 # -------------------------------------------------------------------------
 # Creates a fitness object that minimises its fitness value
@@ -69,46 +71,6 @@ creator.create("Fitness", base.Fitness, weights=(1.0,))
 # Creates a particle with initial declaration of its contained attributes
 creator.create("Particle", np.ndarray, fitness=creator.Fitness, velocity=np.ndarray(DIM), best_known=None)
 
-# ----------------------------Optimisation Functions------------------------------
-# evaluates the fitness of the position using black box optimisation benchmarks
-
-def sphere(individual):
-    return -1.0 * np.sum(np.array(individual)**2),
-
-def rastrigin(individual):
-    # 0.8,0.8,0.8
-    sq_component = np.array(individual) **2
-    cos_component = np.cos(2 * np.pi * np.array(individual))
-    summation = np.subtract(sq_component, 10 * cos_component)
-    return -1.0 * (10 * DIM + np.add.reduce(summation)),
-
-def ackley(individual):
-    sqrt_component = np.sqrt(0.5 * np.add.reduce(np.square(np.array(individual))))
-    # NOTE: converges to -1, 2 dimensions only
-    cos_component = 0.5 * np.cos(2 * np.pi * np.array(individual))
-    return -1.0 * (-20 * np.exp(-0.2 * sqrt_component) - np.exp(cos_component) + np.exp(1) + 20)
-
-def rosenbrock(individual):
-    summation = np.array([100*((individual[i+1] - individual[i]**2)**2) + (individual[i] - 1)**2 for i in range(len(individual)-2)])
-    return -np.add.reduce(summation),
-
-def beale(individual):
-    #NOTE: 2 dimensions only
-    x = individual[0]
-    y = individual[1]
-    first = 1.5 - x + x * y
-    second = 2.25 - x + x * y ** 2
-    third = 2.625 - x + x * y ** 3
-    return -1.0 * (first ** 2 + second ** 2 + third ** 2),
-
-def bukin6(individual):
-    #NOTE:-15 <= x <= -5, -3 <= y <= 3
-    x = individual[0]
-    y = individual[1]
-    sqrt_component = np.sqrt(abs(y - 0.01 * x **2))
-    abs_component = 0.01 * abs(x + 10)
-    return -1.0 * (100 * sqrt_component + abs_component),
-
 # --------------------------Swarm operations ---------------------------------
 
 # generates and returns a particle based on the dim (size) of the problem
@@ -121,39 +83,38 @@ def generate(size, bound_l, bound_u):
 
 # updating the velocity and position of the particle
 def updateParticle(particle, best, w, phi_p, phi_g):
-    r_p = np.array([np.random.uniform(0,1) for _ in particle])
-    r_g = np.array([np.random.uniform(0,1) for _ in particle])
-
-    p = np.subtract(particle.best_known, particle)
-    g = np.subtract(best, particle)
-
-    v_p = phi_p * np.multiply(p, r_p)
-    v_g = phi_g * np.multiply(g, r_g)
-
-    v_w = w * particle.velocity
-    particle.velocity = np.add(v_w, np.add(v_p, v_g))
-    particle[:] = np.add(particle, particle.velocity)
+    # phi_p * r_p and phi_g * r_g, each drawn as one array
+    r_p = np.random.uniform(0, phi_p, len(particle))
+    r_g = np.random.uniform(0, phi_g, len(particle))
+
+    # v_p and v_g are built in place of the differences, and the velocity and
+    # position are updated in place
+    v_p = np.subtract(particle.best_known, particle)
+    v_p *= r_p
+    v_g = np.subtract(best, particle)
+    v_g *= r_g
+
+    v_p += v_g
+    particle.velocity *= w
+    particle.velocity += v_p
+    particle += particle.velocity
 
 # registering all the functions to the toolbox
 toolbox = base.Toolbox()
-toolbox.register("evaluate", sphere)
+toolbox.register("evaluate", evaluateIndividual, kernel=sphere)
 toolbox.register("particle", generate, size=DIM, bound_l=-5, bound_u=5)
 toolbox.register("population", tools.initRepeat, list, toolbox.particle)
 toolbox.register("update", updateParticle, phi_p=0.8, phi_g=0.8, w=0.8)
 
+# times every phase of a generation if PROFILE is set, does nothing otherwise
+profiler = profiling.profiler(PROFILE)
+
 # -----------------------------Main Algorithm--------------------------------
 def main():
 
-    # initialising our population and stats to the logbook
+    # initialising our population and the statistics recorder
     pop = toolbox.population(n=50)
-    stats = tools.Statistics(lambda ind: ind.fitness.values)
-    stats.register("avg", np.mean)
-    stats.register("std", np.std)
-    stats.register("min", np.min)
-    stats.register("max", np.max)
-
-    logbook = tools.Logbook()
-    logbook.header = ["gen"] + stats.fields
+    stats = recorder.Recorder(columns=["gen"])
 
     g = 1
     best = None
@@ -180,45 +141,59 @@ def main():
         for particle in pop:
 
             # move the particles with the update function and eval new fitness
-            toolbox.update(particle, best)
-            particle.fitness.values = toolbox.evaluate(particle)
+            with profiler.phase("update"):
+                toolbox.update(particle, best)
+            with profiler.phase("evaluate"):
+                particle.fitness.values = toolbox.evaluate(particle)
+            profiler.count("evals")
 
             # update the best_known position
             if particle.fitness.values > particle.best_known.fitness.values:
 
-                particle.best_known = creator.Particle(particle)
-                particle.best_known.fitness.values = particle.fitness.values
+                with profiler.phase("copy"):
+                    particle.best_known[:] = particle
+                    particle.best_known.fitness.values = particle.fitness.values
+                profiler.count("copies")
 
                 # if relevant update the best global position
                 if particle.best_known.fitness.values > best.fitness.values:
 
-                    best = creator.Particle(particle.best_known)
-                    best.fitness.values = particle.best_known.fitness.values
+                    with profiler.phase("copy"):
+                        best[:] = particle.best_known
+                        best.fitness.values = particle.best_known.fitness.values
+                    profiler.count("copies")
 
                     # if the fitness has converged, stop evolving
                     if best.fitness.values[0] - prev_best.fitness.values[0] < EPSILON:
-                        logbook.record(gen=g, **stats.compile(pop))
+                        stats.record(recorder.fitnessArray(pop), gen=g)
+                        profiler.record(g)
                         print("fitness values")
-                        print(logbook.stream)
+                        print(stats.stream)
                         return pop, best
 
                     # if the posiiton has converged, stop evolving
                     if np.sqrt(np.add.reduce(np.square(np.subtract(best, prev_best)))) < DELTA:
-                        logbook.record(gen=g, **stats.compile(pop))
+                        stats.record(recorder.fitnessArray(pop), gen=g)
+                        profiler.record(g)
                         print("position values")
-                        print(logbook.stream)
+                        print(stats.stream)
                         return pop, best
 
         # keep track of the previous best position
-        prev_best = creator.Particle(best)
-        prev_best.fitness.values = best.fitness.values
+        with profiler.phase("copy"):
+            prev_best[:] = best
+            prev_best.fitness.values = best.fitness.values
+        profiler.count("copies")
 
         # update our records
-        logbook.record(gen=g, **stats.compile(pop))
+        with profiler.phase("stats"):
+            stats.record(recorder.fitnessArray(pop), gen=g)
+        profiler.record(g)
         g = g + 1
 
-    print(logbook.stream)
+    print(stats.stream)
     return pop, best
 
 if __name__ == "__main__":
     print(main())
+    profiler.close()
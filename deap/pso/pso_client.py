@@ -44,20 +44,24 @@ PSO Algorithm:
 5) return global best
 
 """
-import operator
 import numpy as np
 
 from ctypes import *
 from numpy.ctypeslib import ndpointer
+import os
 import sys
 import platform
-import json
 
 from deap import base
-from deap import benchmarks
 from deap import creator
 from deap import tools
 
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import boundary
+import recorder
+import surrogate
+
 # get library name
 dllname = ""
 if platform.system() == "Windows":
@@ -173,6 +177,7 @@ DELTA = 1e-7
 EPSILON = 1e-7
 BOUND_U = 1
 BOUND_L = 0
+SCREEN = False      # Only spend budget on moves a surrogate model predicts to improve
 
 def evalBbcomp(individual):
 
@@ -206,32 +211,29 @@ def generate(size, bound_l, bound_u):
     particle.best_known = creator.Particle(particle)
     return particle
 
-# NOTE: remember to verify the correctness of this funciton
-# updating the velocity and position of the particle
-
-def updateParticle(particle, best, w, phi_p, phi_g):
-    r_p = [np.random.uniform(0,1) for _ in particle]
-    r_g = [np.random.uniform(0,1) for _ in particle]
-
-    # list of best_known - curr
-    p = list(map(operator.sub, particle.best_known, particle))
+# updating the velocity and position of the particle. Every evaluation spends
+# bbcomp budget, so the particle is reflected back into [BOUND_L, BOUND_U]
+# rather than evaluated outside of it
+def updateParticle(particle, best, w, phi_p, phi_g, vmax):
+    position = np.array(particle)
+    velocity = np.array(particle.velocity)
 
-    # list of global_best - curr
-    g = list(map(operator.sub, best, particle))
+    r_p = np.random.uniform(0, 1, len(particle))
+    r_g = np.random.uniform(0, 1, len(particle))
 
-    # scaled impact of best positions
-    v_p = [phi_p * r * x for x,r in zip(p,r_p)]
-    v_g = [phi_g * r * x for x,r in zip(g,r_g)]
+    # scaled impact of best_known - curr and global_best - curr
+    v_p = phi_p * r_p * (np.array(particle.best_known) - position)
+    v_g = phi_g * r_g * (np.array(best) - position)
 
     # scaled velocity
-    v_w = [w * x for x in particle.velocity]
-    particle.velocity = list(map(operator.add, v_w, map(operator.add, v_p, v_g)))
+    velocity = w * velocity + v_p + v_g
+    boundary.clampVelocity(velocity, vmax)
 
-    for position, velocity in zip(particle, particle.velocity):
-        if position + velocity < BOUND_L or position + velocity > BOUND_U:
-            velocity = velocity * -1.0
+    position += velocity
+    boundary.reflect(position, velocity, BOUND_L, BOUND_U)
 
-    particle[:] = list(map(operator.add, particle, particle.velocity))
+    particle.velocity = list(velocity)
+    particle[:] = list(position)
 
 # -----------------------------------------------------------------------
 
@@ -249,21 +251,22 @@ toolbox = base.Toolbox()
 toolbox.register("evaluate", evalBbcomp)
 toolbox.register("particle", generate, size=dim, bound_l=BOUND_L, bound_u=BOUND_U)
 toolbox.register("population", tools.initRepeat, list, toolbox.particle)
-toolbox.register("update", updateParticle, phi_p=0.05, phi_g=0.05, w=0.05)
+toolbox.register("update", updateParticle, phi_p=0.05, phi_g=0.05, w=0.05, vmax=0.5 * (BOUND_U - BOUND_L))
+
+# a move that the surrogate predicts to be no better than the particle's best
+# known position gets the prediction instead of a bbcomp evaluation, so the
+# budget goes to the promising moves
+particle_screen = None
+if SCREEN:
+    particle_screen = surrogate.ParticleScreen(surrogate.RBFSurrogate(max_points=200))
+    toolbox.decorate("evaluate", particle_screen)
 
 # -----------------------------Main Algorithm--------------------------------
 def main():
 
     # initialising our population and stats
     pop = toolbox.population(n=50)
-    stats = tools.Statistics(lambda ind: ind.fitness.values)
-    stats.register("avg", np.mean)
-    stats.register("std", np.std)
-    stats.register("min", np.min)
-    stats.register("max", np.max)
-
-    logbook = tools.Logbook()
-    logbook.header = ["gen"] + stats.fields
+    stats = recorder.Recorder(columns=["gen"])
 
     g = 1
     best = None
@@ -306,16 +309,16 @@ def main():
 
                     # if the fitness has converged, stop evolving
                     if best.fitness.values[0] - prev_best.fitness.values[0] < EPSILON:
-                        logbook.record(gen=g, **stats.compile(pop))
+                        stats.record(recorder.fitnessArray(pop), gen=g)
                         print("fitness values")
-                        print(logbook.stream)
+                        print(stats.stream)
                         return pop, best
 
                     # if the posiiton has converged, stop evolving
                     if np.sqrt(np.add.reduce(np.square(np.subtract(best, prev_best)))) < DELTA:
-                        logbook.record(gen=g, **stats.compile(pop))
+                        stats.record(recorder.fitnessArray(pop), gen=g)
                         print("position values")
-                        print(logbook.stream)
+                        print(stats.stream)
                         return pop, best
 
         # keep track of the previous best position
@@ -323,11 +326,13 @@ def main():
         prev_best.fitness.values = best.fitness.values
 
         # update our records
-        logbook.record(gen=g, **stats.compile(pop))
+        stats.record(recorder.fitnessArray(pop), gen=g)
         g = g + 1
 
-    print(logbook.stream)
+    print(stats.stream)
     return pop, best
 
 if __name__ == "__main__":
     print(main())
+    if particle_screen is not None:
+        print("surrogate screen: {}".format(particle_screen))
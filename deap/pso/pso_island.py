@@ -0,0 +1,186 @@
+"""
+Island-model Particle Swarm Optimisation
+- Framework: DEAP, NumPy, mpi4py
+- Fitness function: Optimisation Test Functions
+- Swarm Attributes: see swarm.py
+
+Every MPI rank evolves its own sub-swarm (an island) with the algorithm of
+pso_swarm.py. There is no global synchronisation per generation: every
+MIGRATION_FREQ generations, each island sends its best position and fitness to
+its neighbours with nonblocking sends, and merges any migrants that have
+arrived whenever it next checks, without waiting for them.
+
+A migrant replaces the worst particle of the island (its position and best
+known position), and becomes the island's global best if it is better.
+
+Topologies:
+    - "ring": each island sends to the next rank and receives from the previous
+    - "full": each island sends to and receives from every other rank
+
+Run with e.g.
+
+    mpirun -n 4 python pso_island.py
+"""
+import os
+import sys
+
+import numpy as np
+
+from deap import base
+from mpi4py import MPI
+
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import boundary
+import recorder
+import seeding
+import swarm
+from optimisation_functions import rastrigin
+
+GMAX = 500
+DIM = 2
+POPULATION = 50         # Size of each island's swarm
+SEED = 64
+MIGRATION_FREQ = 10     # Generations between migrations
+TOPOLOGY = "ring"       # "ring" or "full"
+MIGRATION_TAG = 7
+
+# registering all the functions to the toolbox
+toolbox = base.Toolbox()
+toolbox.register("swarm", swarm.generate, size=DIM, bound_l=-5, bound_u=5)
+toolbox.register("evaluate", swarm.evaluateSwarm, fitness_fn=rastrigin)
+toolbox.register("bound", boundary.reflect, bound_l=-5, bound_u=5)
+toolbox.register("update", swarm.updateSwarm, phi_p=0.8, phi_g=0.8, w=0.8, bound=toolbox.bound)
+
+# ------------------------------Migration-------------------------------------
+
+# returns the ranks an island sends migrants to and receives migrants from
+def neighbours(rank, size, topology):
+    if size == 1:
+        return [], []
+    if topology == "ring":
+        return [(rank + 1) % size], [(rank - 1) % size]
+    if topology == "full":
+        others = [n for n in range(size) if n != rank]
+        return others, others
+    raise ValueError("unknown topology: " + str(topology))
+
+
+class Migration(object):
+
+    # keeps one receive posted per source at all times and the buffers of
+    # sends that have not completed yet
+    def __init__(self, comm, dim, destinations, sources):
+        self.comm = comm
+        self.destinations = destinations
+        self.sources = sources
+        self.sends = []
+
+        self.buffers = {}
+        self.receives = {}
+        self.received = dict((source, 0) for source in sources)
+        for source in sources:
+            self.buffers[source] = np.empty(dim + 1)
+            self.post(source)
+
+    def post(self, source):
+        self.receives[source] = self.comm.Irecv(self.buffers[source], source=source, tag=MIGRATION_TAG)
+
+    # sends the best position of the island as [fitness, position...]
+    def emigrate(self, island):
+        message = np.concatenate(([island.best_value], island.best))
+        for dest in self.destinations:
+            self.sends.append((self.comm.Isend(message, dest=dest, tag=MIGRATION_TAG), message))
+
+        # forget the sends that have gone through
+        self.sends = [(request, data) for request, data in self.sends if not request.Test()]
+
+    # merges every migrant that has arrived, without waiting for any
+    def immigrate(self, island):
+        for source in self.sources:
+            while self.receives[source].Test():
+                merge(island, self.buffers[source][1:], self.buffers[source][0])
+                self.received[source] += 1
+                self.post(source)
+
+    # waits for the migrants still on their way, so that no message is left
+    # unmatched when the run ends. Every island sends the same number
+    def finish(self, island, expected):
+        for source in self.sources:
+            while self.received[source] < expected:
+                self.receives[source].Wait()
+                merge(island, self.buffers[source][1:], self.buffers[source][0])
+                self.received[source] += 1
+                self.post(source)
+
+            # the last receive posted has nothing left to match
+            self.receives[source].Cancel()
+            self.receives[source].Wait()
+
+        MPI.Request.Waitall([request for request, _ in self.sends])
+        self.sends = []
+
+# replaces the worst particle of the island with a migrant
+def merge(island, position, value):
+    worst = np.argmin(island.weight * island.best_fitness)
+    if not island.better(value, island.best_fitness[worst]):
+        return
+
+    island.position[worst] = position
+    island.best_known[worst] = position
+    island.fitness[worst] = value
+    island.best_fitness[worst] = value
+
+    if island.better(value, island.best_value):
+        island.best = position.copy()
+        island.best_value = value
+
+# -----------------------------Main Algorithm--------------------------------
+def main():
+
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    destinations, sources = neighbours(rank, comm.Get_size(), TOPOLOGY)
+
+    # every island draws from its own random streams
+    start = rank * POPULATION
+    island = toolbox.swarm(n=POPULATION, generator=seeding.SwarmStreams(SEED, start, start + POPULATION))
+    migration = Migration(comm, DIM, destinations, sources)
+
+    stats = recorder.Recorder(columns=["gen", "best"])
+
+    # assigning the fitness values and initialising best known positions
+    toolbox.evaluate(island)
+    swarm.updateBests(island)
+
+    g = 1
+    while g <= GMAX:
+
+        # move the island's swarm and evaluate the new positions
+        toolbox.update(island)
+        toolbox.evaluate(island)
+        swarm.updateBests(island)
+
+        # exchange best positions with the neighbours
+        migration.immigrate(island)
+        if g % MIGRATION_FREQ == 0:
+            migration.emigrate(island)
+
+        stats.record(island.fitness, gen=g, best=island.best_value)
+        g = g + 1
+
+    migration.finish(island, GMAX // MIGRATION_FREQ)
+
+    # report the best of all islands on rank 0
+    value, root = comm.allreduce((island.weight * island.best_value, rank), op=MPI.MAXLOC)
+    best = island.best.copy()
+    comm.Bcast(best, root=root)
+
+    if rank == 0:
+        print(stats.stream)
+    return island, best, value / island.weight
+
+if __name__ == "__main__":
+    island, best, value = main()
+    if MPI.COMM_WORLD.Get_rank() == 0:
+        print(best, value)
@@ -53,6 +53,8 @@ from deap import tools
 
 from scoop import futures
 
+from optimisation_functions import evaluateIndividual, rastrigin
+
 GMAX = 500
 DELTA = 1e-7
 EPSILON = 1e-7
@@ -67,49 +69,6 @@ creator.create("Fitness", base.Fitness, weights=(1.0,))
 #NOTE:????????????????????
 creator.create("Particle", np.ndarray, fitness=creator.Fitness, velocity=np.ndarray(DIM), best_known=None)
 
-# ----------------------------Optimisation Functions------------------------------
-# evaluates the fitness of the position
-
-# NOTE: need to check whether the particles will still find the right place`
-# if they start at a point far away from the optima
-
-def sphere(individual):
-    return -1.0 * np.sum(individual - 3.)**2,
-
-def rastrigin(individual):
-    # 0.8,0.8,0.8
-    sq_component = individual **2
-    cos_component = np.cos(2 * np.pi * individual)
-    summation = np.subtract(sq_component, 10 * cos_component)
-    return -1.0 * (10 * DIM + np.add.reduce(summation)),
-
-def ackley(individual):
-    sqrt_component = np.sqrt(0.5 * np.add.reduce(np.square(individual)))
-    # NOTE: converges to -1, 2 dimensions only
-    cos_component = 0.5 * np.cos(2 * np.pi * individual)
-    return -1.0 * (-20 * np.exp(-0.2 * sqrt_component) - np.exp(cos_component) + np.exp(1) + 20)
-
-def rosenbrock(individual):
-    summation = np.array([100*((individual[i+1] - individual[i]**2)**2) + (individual[i] - 1)**2 for i in range(len(individual)-2)])
-    return -np.add.reduce(summation),
-
-def beale(individual):
-    #NOTE: 2 dimensions only
-    x = individual[0]
-    y = individual[1]
-    first = 1.5 - x + x * y
-    second = 2.25 - x + x * y ** 2
-    third = 2.625 - x + x * y ** 3
-    return -1.0 * (first ** 2 + second ** 2 + third ** 2),
-
-def bukin6(individual):
-    #NOTE:-15 <= x <= -5, -3 <= y <= 3
-    x = individual[0]
-    y = individual[1]
-    sqrt_component = np.sqrt(abs(y - 0.01 * x **2))
-    abs_component = 0.01 * abs(x + 10)
-    return -1.0 * (100 * sqrt_component + abs_component),
-
 # --------------------------Swarm operations ---------------------------------
 
 # generates and returns a particle based on the dim (size) of the problem
@@ -139,7 +98,7 @@ def updateParticle(particle, best, w, phi_p, phi_g):
 
 # registering all the functions to the toolbox
 toolbox = base.Toolbox()
-toolbox.register("evaluate", rastrigin)
+toolbox.register("evaluate", evaluateIndividual, kernel=rastrigin)
 toolbox.register("particle", generate, size=DIM, bound_l=-5, bound_u=5)
 toolbox.register("population", tools.initRepeat, list, toolbox.particle)
 toolbox.register("update", updateParticle, phi_p=0.8, phi_g=0.8, w=0.8)
@@ -43,70 +43,44 @@ Here, we talk about the global best as being the particle that has the best posi
 or in this case, the best output value. Best known refers to the best particle position
 that has been seen by a particular particle.
 
+With ASYNC = True, mainAsync is run instead of main. There is no generation
+barrier: each particle is submitted to a worker on its own and re-dispatched as
+soon as it returns, using whatever the global best is at that point. A slow
+evaluation then only holds up its own particle rather than the whole swarm.
+
 NOTE: there were some issues with using numpy.sum potentially problems with using
 reduce
 
 """
-import numpy as np
+import os
+import sys
 import time
 
+import numpy as np
+
 from deap import base
-from deap import benchmarks
 from deap import creator
 from deap import tools
 
 from scoop import futures
 
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import checkpoint
+import profiling
+import seeding
+from optimisation_functions import evaluateIndividual, rastrigin
+
 GMAX = 5               # Max number of generations
 DELTA = 1e-7           # Smallest position increment allowed
 EPSILON = 1e-7         # Smallest fitness value increment allowed
 DIM = 2                # No. of Dimensions in the problem
 POPULATION = 10        # Size of the particle swarm
-
-# ----------------------------Optimisation Functions------------------------------
-def sphere(individual):
-    try:
-        individual = (individual - 3.)**2
-        return -1.0 * (individual[0] + individual[1]),
-    except:
-        print(individual)
-
-def rastrigin(individual):
-    # 0.8,0.8,0.8
-    sq_component = individual ** 2
-    cos_component = np.cos(2 * np.pi * individual)
-    summation = sq_component - 10. * cos_component
-    total = 0
-    for n in summation:
-        total += n
-    return -1.0 * (10 * DIM + total),
-
-def ackley(individual):
-    sqrt_component = np.sqrt(0.5 * np.add.reduce(np.square(individual)))
-    # NOTE: converges to -1, 2 dimensions only
-    cos_component = 0.5 * np.cos(2 * np.pi * individual)
-    return -1.0 * (-20 * np.exp(-0.2 * sqrt_component) - np.exp(cos_component) + np.exp(1) + 20)
-
-def rosenbrock(individual):
-    summation = np.array([100*((individual[i+1] - individual[i]**2)**2) + (individual[i] - 1)**2 for i in range(len(individual)-2)])
-    return -np.add.reduce(summation),
-
-def beale(individual):
-    #NOTE: 2 dimensions only
-    x = individual[0]
-    y = individual[1]
-    first = 1.5 - x + x * y
-    second = 2.25 - x + x * y ** 2
-    third = 2.625 - x + x * y ** 3
-    return -1.0 * (first ** 2 + second ** 2 + third ** 2),
-
-def bukin6(individual):
-    #NOTE:-15 <= x <= -5, -3 <= y <= 3
-    x = individual[0]
-    y = individual[1]
-    sqrt_component = np.sqrt(abs(y - 0.01 * x **2))
-    abs_component = 0.01 * abs(x + 10)
-    return -1.0 * (100 * sqrt_component + abs_component),
+ASYNC = False          # Re-dispatch each particle as soon as it is evaluated
+SEED = 64              # Master seed for all random streams
+CHECKPOINT = "pso_parallel.ckpt"   # Resumed from if it exists, removed once the run completes
+CHECKPOINT_FREQ = 1    # Generations between checkpoints
+PROFILE = None         # Trace file for per-generation timings, e.g. "pso_parallel.trace.jsonl"
 
 # --------------------------Swarm operations ---------------------------------
 # Creates a fitness object that maximises its fitness value
@@ -126,19 +100,21 @@ def generate(bound_l, bound_u):
 # updating the velocity and position of the particle
 def updateParticle(particle, best, generator, w, phi_p, phi_g):
 
-    r_p = np.array([generator.uniform(0,1) for _ in particle])
-    r_g = np.array([generator.uniform(0,1) for _ in particle])
-    #NOTE: random seed is the same in each process, so in parallel, the performance is poor
+    # phi_p * r_p and phi_g * r_g, each drawn as one array
+    r_p = generator.uniform(0, phi_p, len(particle))
+    r_g = generator.uniform(0, phi_g, len(particle))
 
-    p = np.subtract(particle.best_known, particle)
-    g = np.subtract(best, particle)
+    # v_p and v_g are built in place of the differences, and the velocity and
+    # position are updated in place
+    v_p = np.subtract(particle.best_known, particle)
+    v_p *= r_p
+    v_g = np.subtract(best, particle)
+    v_g *= r_g
 
-    v_p = phi_p * np.multiply(p, r_p)
-    v_g = phi_g * np.multiply(g, r_g)
-
-    v_w = w * particle.velocity
-    particle.velocity[:] = np.add(v_w, np.add(v_p, v_g))
-    particle[:] = np.add(particle, particle.velocity)
+    v_p += v_g
+    particle.velocity *= w
+    particle.velocity += v_p
+    particle += particle.velocity
 
 # initialise the swarm with fitness values.
 def initialiseSwarm(particle):
@@ -149,90 +125,181 @@ def initialiseSwarm(particle):
 
     return particle.fitness.values
 
-# updates a particle with new values
-def updateSwarm(particle, best, generator):
+def createBest(best):
+    particle = creator.Particle(best)
+    particle.fitness.values = best.fitness.values
+    return particle
+
+# moves a single particle on a worker. The worker only sees a copy of the
+# particle, so it is returned together with its index in the swarm. The random
+# stream is derived from the master seed, the particle index and the move
+# number g, so it does not matter which worker runs it
+def moveParticle(n, g, particle, best):
 
-    # move the particles with the update function and eval new fitness
-    toolbox.update(particle, best, generator)
+    # move the particle with the update function and eval new fitness
+    toolbox.update(particle, best, seeding.particleGenerator(SEED, n, g))
     particle.fitness.values = toolbox.evaluate(particle)
 
-    # if the particle output is better than the best known output, update the
-    # best known for this particle
+    # update the best known position, the global best is updated by the caller
     if particle.fitness.values > particle.best_known.fitness.values:
 
-        particle.best_known = creator.Particle(particle)
+        particle.best_known[:] = particle
         particle.best_known.fitness.values = particle.fitness.values
 
-        # if the particle best known happens to be better than the global best
-        # then also update the global best value 
-        if particle.best_known.fitness.values > best.fitness.values:
-
-            best = creator.Particle(particle.best_known)
-            best.fitness.values = particle.best_known.fitness.values
-
     time.sleep(5)    # simulating long computation time
-    return best
-
-def createBest(best):
-    particle = creator.Particle(best)
-    particle.fitness.values = best.fitness.values
-    return particle
+    return n, particle
 # ---------------------- toolbox -------------------------------------
 # registering all the functions to the toolbox for more convenient access
 # by assignment default parameter values. To use these functions call
 # toolbox.<functionname>
 toolbox = base.Toolbox()
-toolbox.register("evaluate", rastrigin)
+toolbox.register("evaluate", evaluateIndividual, kernel=rastrigin)
 toolbox.register("particle", generate, bound_l=-5, bound_u=5)
 toolbox.register("population", tools.initRepeat, list, toolbox.particle)
 toolbox.register("update", updateParticle, phi_p=0.8, phi_g=0.8, w=0.8)
 toolbox.register("map", futures.map)
+toolbox.register("submit", futures.submit)
+
+# times every phase of a generation if PROFILE is set, does nothing otherwise
+profiler = profiling.profiler(PROFILE)
+
+# the checkpointer of both versions of main. The parameters tell a snapshot of
+# one version from one of the other
+def checkpointer():
+    params = {"gmax": GMAX, "dim": DIM, "population": POPULATION, "seed": SEED, "async": ASYNC}
+    return checkpoint.Checkpointer(CHECKPOINT, frequency=CHECKPOINT_FREQ, params=params)
 
 # ---------------------------------------------------------------------
 def main():
 
-    # initialise the swarm of particles with their fitness values
-    pop = toolbox.population(n=POPULATION)
-    fitness = list(map(initialiseSwarm, pop))
+    # carry on from the last checkpoint if there is one
+    checkpoints = checkpointer()
+    state = checkpoints.load()
+
+    if state is None:
 
-    # initialise the global best particle in the swarm
-    best = creator.Particle(pop[fitness.index(max(fitness))])
-    best.fitness.values = pop[fitness.index(max(fitness))].fitness.values
+        # the initial swarm is created on the master process only
+        seeding.seedAll(SEED)
+
+        # initialise the swarm of particles with their fitness values
+        pop = toolbox.population(n=POPULATION)
+        fitness = list(map(initialiseSwarm, pop))
+
+        # initialise the global best particle in the swarm
+        best = createBest(pop[fitness.index(max(fitness))])
+        g = 1
+
+    else:
+        pop = state["pop"]
+        best = state["best"]
+        g = state["gen"]
 
     # create a list of global best particles so that we can map each particle
-    # to a global best value when updating the particle positions. At the same time,
-    # create a list of random generators so that each process runs with a different seed
-    # as this also impacts the performance of the algorithm
+    # to a global best value when updating the particle positions
     global_best = []
-    random_generators = []
     for _ in range(POPULATION):
         global_best.append(createBest(best))
-        random_generators.append(np.random.RandomState())
 
-    g = 1
     while g <= GMAX:
 
-        # update the particles in the swarm and return a list of the new global
-        # best particles
-        global_best = list(toolbox.map(updateSwarm, pop, global_best, random_generators))
+        # update the particles in the swarm and put the moved particles back
+        # into the swarm
+        with profiler.phase("map"):
+            moved = toolbox.map(moveParticle, range(POPULATION), [g] * POPULATION, pop, global_best)
+            for n, particle in moved:
+                pop[n] = particle
+        profiler.count("evals", POPULATION)
 
-        # calculate the best global best from the list and create a new global
-        # best list
-        best = creator.Particle(global_best[0])
-        best.fitness.values = global_best[0].fitness.values
-        for n in range(1, POPULATION):
-            if global_best[n].fitness.values > best.fitness.values:
-                best = creator.Particle(global_best[n])
-                best.fitness.values = global_best[n].fitness.values
+        # calculate the new global best from the best known positions and
+        # create a new global best list
+        with profiler.phase("bests"):
+            for particle in pop:
+                if particle.best_known.fitness.values > best.fitness.values:
+                    best = createBest(particle.best_known)
 
-        global_best = []
-        for _ in range(POPULATION):
-            global_best.append(createBest(best))
+            global_best = []
+            for _ in range(POPULATION):
+                global_best.append(createBest(best))
+
+        profiler.record(g)
 
         # iterate the generation
         g = g + 1
 
+        # the random streams are keyed by particle and generation, so the
+        # swarm and the generation counter are all that is needed to resume
+        if checkpoints.due(g):
+            checkpoints.save({"gen": g, "pop": pop, "best": best})
+
+    checkpoints.finish()
+    return pop, best
+
+# asynchronous version of main: instead of waiting for the whole swarm at the
+# end of every generation, each particle is sent off again as soon as it comes
+# back, moving towards the freshest global best. Every particle is still moved
+# GMAX times, so the number of evaluations is the same as in main()
+def mainAsync():
+
+    # carry on from the last checkpoint if there is one
+    checkpoints = checkpointer()
+    state = checkpoints.load()
+
+    if state is None:
+
+        # the initial swarm is created on the master process only
+        seeding.seedAll(SEED)
+
+        # initialise the swarm of particles with their fitness values
+        pop = toolbox.population(n=POPULATION)
+        fitness = list(map(initialiseSwarm, pop))
+
+        # initialise the global best particle in the swarm
+        best = createBest(pop[fitness.index(max(fitness))])
+
+        # the number of moves each particle has come back from
+        moves = [0] * POPULATION
+        returned = 0
+
+    else:
+        pop = state["pop"]
+        best = state["best"]
+        moves = state["moves"]
+        returned = state["returned"]
+
+    # the moves that were in flight when the checkpoint was written are sent
+    # off again from the particle as it last came back, with the same stream
+    pending = [toolbox.submit(moveParticle, n, moves[n] + 1, pop[n], best)
+               for n in range(POPULATION) if moves[n] < GMAX]
+
+    while pending:
+
+        # wait for any particle to come back rather than all of them
+        done, not_done = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+        pending = list(not_done)
+
+        for future in done:
+            n, particle = future.result()
+            pop[n] = particle
+
+            if particle.best_known.fitness.values > best.fitness.values:
+                best = createBest(particle.best_known)
+
+            # re-dispatch the particle straight away with the current best
+            moves[n] = moves[n] + 1
+            if moves[n] < GMAX:
+                pending.append(toolbox.submit(moveParticle, n, moves[n] + 1, particle, best))
+
+            # a checkpoint every CHECKPOINT_FREQ swarms' worth of moves
+            returned = returned + 1
+            if returned % POPULATION == 0 and checkpoints.due(returned // POPULATION):
+                checkpoints.save({"pop": pop, "best": best, "moves": moves, "returned": returned})
+
+    checkpoints.finish()
     return pop, best
 
 if __name__ == "__main__":
-    print(main())
+    if ASYNC:
+        print(mainAsync())
+    else:
+        print(main())
+    profiler.close()
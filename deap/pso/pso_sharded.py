@@ -0,0 +1,174 @@
+"""
+Particle Swarm Optimisation on a sharded swarm
+- Framework: DEAP, NumPy, mpi4py
+- Fitness function: Optimisation Test Functions
+- Swarm Attributes: see swarm.py
+
+pso_parallel.py sends every particle, a copy of the global best and a random
+generator to a worker every generation and gets the whole particle back. Here
+every MPI rank owns a shard of the swarm (a swarm.Swarm of its own particles)
+for the whole run, so particles never leave the process they were created on.
+Per generation the only communication is:
+
+    - every rank offers the fitness of its shard's best position (allreduce
+      with MAXLOC, a single float and rank per process)
+    - the winning rank broadcasts the new global best position, a dim-length
+      vector of doubles
+    - a few floats per rank so that rank 0 can record the stats
+
+The algorithm itself is the same as pso_swarm.py.
+
+Run with e.g.
+
+    mpirun -n 3 python pso_sharded.py
+"""
+import os
+import sys
+
+import numpy as np
+
+from deap import base
+from deap import tools
+from mpi4py import MPI
+
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import boundary
+import seeding
+import swarm
+from optimisation_functions import rastrigin
+
+GMAX = 500
+DELTA = 1e-7
+EPSILON = 1e-7
+DIM = 2
+POPULATION = 50
+SEED = 64
+
+# registering all the functions to the toolbox
+toolbox = base.Toolbox()
+toolbox.register("swarm", swarm.generate, size=DIM, bound_l=-5, bound_u=5)
+toolbox.register("evaluate", swarm.evaluateSwarm, fitness_fn=rastrigin)
+toolbox.register("bound", boundary.reflect, bound_l=-5, bound_u=5)
+toolbox.register("update", swarm.updateSwarm, phi_p=0.8, phi_g=0.8, w=0.8, bound=toolbox.bound)
+
+# ------------------------------Communication---------------------------------
+
+# the number of particles owned by each rank, spreading any remainder over the
+# first ranks
+def shardSizes(n, size):
+    sizes = np.full(size, n // size)
+    sizes[:n % size] += 1
+    return sizes
+
+# finds the best of the shard bests across all ranks and sets it as the best
+# of the local shard
+def shareBest(comm, shard):
+
+    # MAXLOC on the weighted value, so that the best rank wins whether the
+    # fitness is maximised or minimised
+    value, root = comm.allreduce((shard.weight * shard.best_value, comm.Get_rank()), op=MPI.MAXLOC)
+
+    best = shard.best.copy()
+    comm.Bcast(best, root=root)
+
+    shard.best = best
+    shard.best_value = value / shard.weight
+
+# reduces the fitness values of all shards into the stats that are recorded in
+# the logbook. Only rank 0 gets the result
+def compileStats(comm, shard):
+
+    # the count, mean and sum of squared deviations (M2) of every shard
+    mean = np.mean(shard.fitness)
+    local = np.array([len(shard), mean, np.sum((shard.fitness - mean) ** 2)])
+    shards = np.zeros((comm.Get_size(), 3)) if comm.Get_rank() == 0 else None
+    comm.Gather(local, shards, root=0)
+
+    low = comm.reduce(np.min(shard.fitness), op=MPI.MIN, root=0)
+    high = comm.reduce(np.max(shard.fitness), op=MPI.MAX, root=0)
+
+    if comm.Get_rank() != 0:
+        return None
+
+    # merges the shards one by one with the parallel variance formula (Chan et
+    # al.), which never subtracts two large sums of squares
+    n, mean, m2 = shards[0]
+    for n_b, mean_b, m2_b in shards[1:]:
+        delta = mean_b - mean
+        total = n + n_b
+        mean = mean + delta * n_b / total
+        m2 = m2 + m2_b + delta * delta * n * n_b / total
+        n = total
+
+    return {"avg": mean, "std": np.sqrt(m2 / n), "min": low, "max": high}
+
+# -----------------------------Main Algorithm--------------------------------
+def main():
+
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+
+    # every rank needs at least one particle for its shard best. All ranks
+    # know the sizes, so they all stop, and rank 0 says why
+    if comm.Get_size() > POPULATION:
+        if rank == 0:
+            sys.stderr.write("pso_sharded: %i ranks for %i particles, run with at most %i ranks\n"
+                             % (comm.Get_size(), POPULATION, POPULATION))
+        sys.exit(1)
+
+    # every rank creates and keeps its own shard of the swarm. The random
+    # streams belong to the particles, not the rank, so the run is the same
+    # for any number of ranks
+    sizes = shardSizes(POPULATION, comm.Get_size())
+    start = np.sum(sizes[:rank])
+    stop = start + sizes[rank]
+    shard = toolbox.swarm(n=sizes[rank], generator=seeding.SwarmStreams(SEED, start, stop))
+
+    logbook = tools.Logbook()
+    logbook.header = ["gen", "avg", "std", "min", "max"]
+
+    # assigning the fitness values and initialising best known positions
+    toolbox.evaluate(shard)
+    swarm.updateBests(shard)
+    shareBest(comm, shard)
+
+    g = 1
+    while g <= GMAX:
+
+        # keep track of the previous best position
+        prev_best = shard.best
+        prev_value = shard.best_value
+
+        # move the local particles and evaluate the new positions
+        toolbox.update(shard)
+        toolbox.evaluate(shard)
+        swarm.updateBests(shard)
+
+        record = compileStats(comm, shard)
+        if rank == 0:
+            logbook.record(gen=g, **record)
+
+        # every rank ends up with the same global best, so they all stop at
+        # the same generation
+        shareBest(comm, shard)
+        if shard.better(shard.best_value, prev_value):
+
+            # if the fitness has converged, stop evolving
+            if abs(shard.best_value - prev_value) < EPSILON:
+                break
+
+            # if the position has converged, stop evolving
+            if np.sqrt(np.add.reduce(np.square(shard.best - prev_best))) < DELTA:
+                break
+
+        g = g + 1
+
+    if rank == 0:
+        print(logbook.stream)
+    return shard, shard.best
+
+if __name__ == "__main__":
+    shard, best = main()
+    if MPI.COMM_WORLD.Get_rank() == 0:
+        print(best)
@@ -44,7 +44,8 @@ PSO Algorithm:
 5) return global best
 
 """
-import operator
+import os
+import sys
 import numpy as np
 
 from sklearn.svm import SVC
@@ -52,14 +53,24 @@ from sklearn import datasets
 from sklearn.model_selection import cross_val_score
 
 from deap import base
-from deap import benchmarks
 from deap import creator
 from deap import tools
 
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import boundary
+import cache
+import recorder
+import surrogate
+
 GMAX = 100
 DELTA = 1e-4
 EPSILON = 1e-4
 DIM = 1
+CACHE_SIZE = 4096       # Max no. of evaluations kept in memory
+CACHE_DECIMALS = 3      # Positions closer than this share a cached evaluation
+CACHE_PATH = None       # File to keep evaluations in across runs, e.g. "svc.cache"
+SCREEN = False          # Only cross validate moves a surrogate model predicts to improve
 # ----------------------------Toolbox Functions----------------------------
 # Creates a fitness object that minimises its fitness value
 creator.create("Fitness", base.Fitness, weights=(1.0,))
@@ -89,23 +100,24 @@ def generate(size, bound_l, bound_u):
 # NOTE: remember to verify the correctness of this funciton
 # updating the velocity and position of the particle
 def updateParticle(particle, best, w, phi_p, phi_g):
-    r_p = np.array([np.random.uniform(0,1) for _ in particle])
-    r_g = np.array([np.random.uniform(0,1) for _ in particle])
-
-    p = np.subtract(particle.best_known, particle)
-    g = np.subtract(best, particle)
+    # phi_p * r_p and phi_g * r_g, each drawn as one array
+    r_p = np.random.uniform(0, phi_p, len(particle))
+    r_g = np.random.uniform(0, phi_g, len(particle))
 
-    v_p = phi_p * np.multiply(p, r_p)
-    v_g = phi_g * np.multiply(g, r_g)
+    # v_p and v_g are built in place of the differences, and the velocity and
+    # position are updated in place
+    v_p = np.subtract(particle.best_known, particle)
+    v_p *= r_p
+    v_g = np.subtract(best, particle)
+    v_g *= r_g
 
-    v_w = w * particle.velocity
-    particle.velocity = np.add(v_w, np.add(v_p, v_g))
+    v_p += v_g
+    particle.velocity *= w
+    particle.velocity += v_p
+    particle += particle.velocity
 
-    for n in range(len(particle)):
-        if particle[n] + particle.velocity[n] < 0:
-            particle[n] = -1.0 * (particle[n] + particle.velocity[n])
-        else:
-            particle[n] = particle[n] + particle.velocity[n]
+    # C has to be positive, so bounce off 0
+    boundary.reflect(particle, particle.velocity, 0., np.inf)
 
 # registering all the functions to the toolbox
 toolbox = base.Toolbox()
@@ -114,19 +126,24 @@ toolbox.register("particle", generate, size=DIM, bound_l=0, bound_u=20)
 toolbox.register("population", tools.initRepeat, list, toolbox.particle)
 toolbox.register("update", updateParticle, phi_p=0.8, phi_g=0.8, w=0.8)
 
+# particles that converge on the same C value share a single cross validation
+evaluation_cache = cache.EvaluationCache(maxsize=CACHE_SIZE, decimals=CACHE_DECIMALS, path=CACHE_PATH)
+toolbox.decorate("evaluate", evaluation_cache)
+
+# a move that the surrogate predicts to be no better than the particle's best
+# known position gets the prediction instead of a cross validation. Decorated
+# after the cache, so that predictions are never cached
+particle_screen = None
+if SCREEN:
+    particle_screen = surrogate.ParticleScreen(surrogate.RBFSurrogate(max_points=200))
+    toolbox.decorate("evaluate", particle_screen)
+
 # -----------------------------Main Algorithm--------------------------------
 def main():
 
     # initialising our population and stats
     pop = toolbox.population(n=100)
-    stats = tools.Statistics(lambda ind: ind.fitness.values)
-    stats.register("avg", np.mean)
-    stats.register("std", np.std)
-    stats.register("min", np.min)
-    stats.register("max", np.max)
-
-    logbook = tools.Logbook()
-    logbook.header = ["gen"] + stats.fields
+    stats = recorder.Recorder(columns=["gen"])
 
     g = 1
     best = None
@@ -159,39 +176,43 @@ def main():
             # update the best_known position
             if particle.fitness.values > particle.best_known.fitness.values:
 
-                particle.best_known = creator.Particle(particle)
+                particle.best_known[:] = particle
                 particle.best_known.fitness.values = particle.fitness.values
 
                 # if relevant update the best global position
                 if particle.best_known.fitness.values > best.fitness.values:
 
-                    best = creator.Particle(particle.best_known)
+                    best[:] = particle.best_known
                     best.fitness.values = particle.best_known.fitness.values
 
                     # if the fitness has converged, stop evolving
                     if best.fitness.values[0] - prev_best.fitness.values[0] < EPSILON:
-                        logbook.record(gen=g, **stats.compile(pop))
+                        stats.record(recorder.fitnessArray(pop), gen=g)
                         print("fitness values")
-                        print(logbook.stream)
+                        print(stats.stream)
                         return pop, best
 
                     # if the posiiton has converged, stop evolving
                     if np.sqrt(np.add.reduce(np.square(np.subtract(best, prev_best)))) < DELTA:
-                        logbook.record(gen=g, **stats.compile(pop))
+                        stats.record(recorder.fitnessArray(pop), gen=g)
                         print("position values")
-                        print(logbook.stream)
+                        print(stats.stream)
                         return pop, best
 
         # keep track of the previous best position
-        prev_best = creator.Particle(best)
+        prev_best[:] = best
         prev_best.fitness.values = best.fitness.values
 
         # update our records
-        logbook.record(gen=g, **stats.compile(pop))
+        stats.record(recorder.fitnessArray(pop), gen=g)
         g = g + 1
 
-    print(logbook.stream)
+    print(stats.stream)
     return pop, best
 
 if __name__ == "__main__":
     print(main())
+    print("evaluation cache: {}".format(evaluation_cache))
+    if particle_screen is not None:
+        print("surrogate screen: {}".format(particle_screen))
+    evaluation_cache.close()
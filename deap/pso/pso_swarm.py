@@ -0,0 +1,161 @@
+"""
+Particle Swarm Optimisation on a vectorised swarm
+- Framework: DEAP, NumPy
+- Fitness function: Optimisation Test Functions
+- Swarm Attributes: see swarm.py
+- Constants: upper/lower bounds (b_u, b_l: generate function, uniform),
+             inertia weighting (w: swarm evolution function -> velocity equation),
+             accel coefficients (phi_p, phi_g: swarm evolution function -> velocity equation),
+             diversify search (r_p, r_g: swarm evolution function, velocity equation),
+
+Same algorithm as pso_adjusted.py, but the swarm is a swarm.Swarm (positions,
+velocities and best positions held as (n, dim) arrays) rather than a list of
+creator.Particle objects. A generation moves every particle in one vectorised
+step, evaluates the whole swarm and then updates the best known and global best
+positions.
+
+1) swarm initialisation
+    - initialise the positions from a uniform distribution with b_l and b_u
+    - sample the velocities from a uniform distribution
+    - evaluate the swarm and find the global best position
+
+2) swarm evolution
+    - move all particles with the velocity equation
+    - evaluate the swarm
+    - update the best known positions, and the global best position
+    - check <termination conditions> if the global best has moved
+
+3) termination conditions
+    - global best displacement smaller than delta
+    - fitness value of best increased by less than threshold epsilon
+    - exceeded max generations
+
+4) return global best
+
+NOTE: the global best is only updated once per generation, whereas
+pso_adjusted.py updates it after every particle.
+"""
+import os
+import sys
+
+import numpy as np
+
+from deap import base
+
+# the modules shared by the PSO and GA scripts live in deap/common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import boundary
+import checkpoint
+import profiling
+import recorder
+import seeding
+import surrogate
+import swarm
+import topology
+from optimisation_functions import sphere
+
+GMAX = 500
+HISTORY = 1000                    # Generations of statistics kept in memory
+DELTA = 1e-7
+EPSILON = 1e-7
+DIM = 2
+POPULATION = 50
+SEED = 64
+CHECKPOINT = "pso_swarm.ckpt"     # Resumed from if it exists, removed once the run completes
+CHECKPOINT_FREQ = 10              # Generations between checkpoints
+SCREEN_FRACTION = None            # Fraction of the swarm really evaluated, e.g. 0.2
+TOPOLOGY = None                   # None for a global best, or e.g. topology.ring(POPULATION)
+DTYPE = np.float64                # np.float32 halves the memory of large swarms
+PROFILE = None                    # Trace file for per-generation timings, e.g. "pso_swarm.trace.jsonl"
+
+# registering all the functions to the toolbox
+toolbox = base.Toolbox()
+toolbox.register("swarm", swarm.generate, size=DIM, bound_l=-5, bound_u=5, dtype=DTYPE)
+toolbox.register("evaluate", swarm.evaluateSwarm, fitness_fn=sphere)
+toolbox.register("bound", boundary.reflect, bound_l=-5, bound_u=5)
+toolbox.register("update", swarm.updateSwarm, phi_p=0.8, phi_g=0.8, w=0.8, bound=toolbox.bound)
+
+# for expensive objectives, only the positions a surrogate model rates best
+# are really evaluated
+if SCREEN_FRACTION is not None:
+    toolbox.register("evaluate", surrogate.evaluateScreened, fitness_fn=sphere,
+                     model=surrogate.RBFSurrogate(), fraction=SCREEN_FRACTION)
+
+# times every phase of a generation if PROFILE is set, does nothing otherwise
+profiler = profiling.profiler(PROFILE)
+
+# -----------------------------Main Algorithm--------------------------------
+def main():
+
+    # carry on from the last checkpoint if there is one
+    params = {"gmax": GMAX, "dim": DIM, "population": POPULATION, "seed": SEED}
+    checkpointer = checkpoint.Checkpointer(CHECKPOINT, frequency=CHECKPOINT_FREQ, params=params)
+    state = checkpointer.load()
+
+    if state is None:
+
+        # initialising our swarm and the statistics recorder
+        pop = toolbox.swarm(n=POPULATION, generator=seeding.SwarmStreams(SEED, 0, POPULATION))
+        stats = recorder.Recorder(columns=["gen", "evals"], capacity=HISTORY)
+
+        # assigning the fitness values and initialising best known positions
+        toolbox.evaluate(pop)
+        swarm.updateBests(pop)
+        g = 1
+
+    else:
+        pop = state["swarm"]
+        stats = state["stats"]
+        g = state["gen"]
+
+    while g <= GMAX:
+
+        # keep track of the previous best position
+        prev_best = pop.best
+        prev_value = pop.best_value
+
+        # move the whole swarm and evaluate the new positions
+        with profiler.phase("update"):
+            if TOPOLOGY is None:
+                toolbox.update(pop)
+            else:
+                toolbox.update(pop, best=topology.localBest(pop, TOPOLOGY))
+        with profiler.phase("evaluate"):
+            evaluated = toolbox.evaluate(pop)
+        profiler.count("evals", np.count_nonzero(evaluated))
+
+        # update our records
+        with profiler.phase("stats"):
+            stats.record(pop.fitness, gen=g, evals=np.count_nonzero(evaluated))
+
+        with profiler.phase("bests"):
+            moved = swarm.updateBests(pop, evaluated)
+        profiler.record(g)
+
+        if moved:
+
+            # if the fitness has converged, stop evolving
+            if abs(pop.best_value - prev_value) < EPSILON:
+                print("fitness values")
+                break
+
+            # if the position has converged, stop evolving
+            if np.sqrt(np.add.reduce(np.square(pop.best - prev_best))) < DELTA:
+                print("position values")
+                break
+
+        g = g + 1
+
+        # the swarm, its random streams and the statistics are everything that is
+        # needed to carry on from generation g
+        if checkpointer.due(g):
+            with profiler.phase("checkpoint"):
+                checkpointer.save({"gen": g, "swarm": pop, "stats": stats})
+
+    checkpointer.finish()
+    print(stats.stream)
+    return pop, pop.best
+
+if __name__ == "__main__":
+    print(main())
+    profiler.close()
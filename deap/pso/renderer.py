@@ -0,0 +1,76 @@
+"""
+Swarm animations over a cached fitness landscape
+
+The fitness surface behind the swarm does not change between frames, so it is
+evaluated once, as a single batch of grid positions through one of the kernels
+in optimisation_functions.py, and cached per (kernel, bounds, step). Each frame
+then only moves the particle scatter and hands the figure to a matplotlib movie
+writer, which pipes it straight into the output file:
+
+    with SwarmRenderer("beale.mp4", beale, bounds=(-5, 5, -5, 5), step=0.01) as movie:
+        movie.frame(pop)
+        ...
+
+The writer is picked from the file extension: ".mp4" needs ffmpeg on the PATH,
+".gif" only needs Pillow.
+"""
+import functools
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib import animation
+
+WRITERS = {".mp4": animation.FFMpegWriter, ".gif": animation.PillowWriter}
+
+# the fitness values on the grid of the bounds (xmin, xmax, ymin, ymax), with
+# rows along y as imshow expects. The array is shared, do not modify it
+@functools.lru_cache(maxsize=8)
+def landscape(kernel, bounds, step):
+    xmin, xmax, ymin, ymax = bounds
+    x = np.arange(xmin, xmax, step)
+    y = np.arange(ymin, ymax, step)
+    X, Y = np.meshgrid(x, y)
+    Z = kernel(np.column_stack((X.ravel(), Y.ravel())))
+    return Z.reshape(X.shape)
+
+
+class SwarmRenderer(object):
+
+    # optimum, if given, is marked on the landscape, e.g. (3, 0.5) for beale
+    def __init__(self, path, kernel, bounds, step=0.025, fps=5, dpi=100, optimum=None):
+        self.figure = plt.figure()
+        axes = self.figure.gca()
+
+        # the kernels are negated for maximisation, so plot the original values
+        surface = axes.imshow(-landscape(kernel, tuple(bounds), step),
+                              interpolation="bilinear",
+                              origin="lower",
+                              extent=bounds)
+        self.figure.colorbar(surface, shrink=0.5, aspect=5)
+
+        if optimum is not None:
+            axes.plot([optimum[0]], [optimum[1]], "ro")
+        self.scatter = axes.scatter([], [], c="w")
+        axes.set_xlim(bounds[0], bounds[1])
+        axes.set_ylim(bounds[2], bounds[3])
+
+        extension = path[path.rfind("."):]
+        self.writer = WRITERS[extension](fps=fps)
+        self.writer.setup(self.figure, path, dpi=dpi)
+
+    # positions is a list of particles or an (n, 2) array
+    def frame(self, positions):
+        self.scatter.set_offsets(np.asarray(positions)[:, :2])
+        self.writer.grab_frame()
+
+    def close(self):
+        self.writer.finish()
+        plt.close(self.figure)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,154 @@
+"""
+Surrogate-assisted pre-screening for expensive objectives
+
+For objectives like the cross-validated SVC in pso_svc.py or the BBComp black
+box in pso_client.py, the real evaluations are the cost that matters. Most moves
+of a swarm are not worth one, so every true evaluation is also used to fit a
+cheap model of the fitness landscape:
+
+    cubic radial basis function interpolant with a linear tail
+
+        s(x) = sum_i lambda_i * |x - x_i|^3 + c . x + c_0
+
+Each generation the model scores the proposed positions of the whole swarm and
+only the most promising `fraction` of particles are really evaluated. The other
+particles are given the predicted fitness, which is only used for the stats:
+pass the returned mask to swarm.updateBests so that predictions never become
+best known positions.
+
+    model = RBFSurrogate(max_points=500)
+    toolbox.register("evaluate", evaluateScreened, fitness_fn=rastrigin,
+                     model=model, fraction=0.2)
+    evaluated = toolbox.evaluate(pop)
+    swarm.updateBests(pop, evaluated)
+
+The scripts that move and evaluate one creator.Particle at a time (pso_svc.py,
+pso_client.py) never see the whole swarm's proposals at once, so ParticleScreen
+decides per particle instead: a move is only really evaluated if the model
+predicts it improves on the particle's best known position. Otherwise the
+particle gets the prediction, which by construction cannot replace its best
+known position:
+
+    particle_screen = ParticleScreen(RBFSurrogate(max_points=200))
+    toolbox.register("evaluate", svc_example, data=digits.data, targets=digits.target)
+    toolbox.decorate("evaluate", particle_screen)
+"""
+import functools
+
+import numpy as np
+
+
+class RBFSurrogate(object):
+
+    # only the last max_points evaluations are kept, fitting is O(max_points^3)
+    def __init__(self, max_points=500):
+        self.max_points = max_points
+        self.points = None
+        self.values = None
+        self.coefficients = None
+
+    def __len__(self):
+        return 0 if self.points is None else len(self.points)
+
+    # the model needs at least dim + 2 points to fit the linear tail
+    def ready(self, dim):
+        return len(self) >= dim + 2
+
+    def add(self, positions, values):
+        if self.points is None:
+            self.points = positions.copy()
+            self.values = values.copy()
+        else:
+            self.points = np.concatenate((self.points, positions))[-self.max_points:]
+            self.values = np.concatenate((self.values, values))[-self.max_points:]
+        self.coefficients = None
+
+    # solves the interpolation system, with least squares as duplicate points
+    # make it singular
+    def fit(self):
+        m, dim = self.points.shape
+        tail = np.hstack((self.points, np.ones((m, 1))))
+
+        system = np.zeros((m + dim + 1, m + dim + 1))
+        system[:m, :m] = distances(self.points, self.points) ** 3
+        system[:m, m:] = tail
+        system[m:, :m] = tail.T
+
+        rhs = np.concatenate((self.values, np.zeros(dim + 1)))
+        self.coefficients = np.linalg.lstsq(system, rhs, rcond=None)[0]
+
+    def predict(self, positions):
+        if self.coefficients is None:
+            self.fit()
+        m = len(self.points)
+        tail = np.hstack((positions, np.ones((len(positions), 1))))
+        return (distances(positions, self.points) ** 3).dot(self.coefficients[:m]) + \
+            tail.dot(self.coefficients[m:])
+
+# euclidean distance between every row of a and every row of b
+def distances(a, b):
+    sq = np.sum(a ** 2, axis=1)[:, np.newaxis] + np.sum(b ** 2, axis=1) - 2 * a.dot(b.T)
+    return np.sqrt(np.maximum(sq, 0.))
+
+# evaluates the most promising fraction of a swarm.Swarm according to the model
+# and predicts the rest. Returns a boolean mask of the particles that were
+# really evaluated, which are also added to the model
+def evaluateScreened(swarm, fitness_fn, model, fraction, batched=True):
+
+    n = len(swarm)
+    evaluated = np.ones(n, dtype=bool)
+
+    if model.ready(swarm.dim):
+        predicted = model.predict(swarm.position)
+
+        # best predicted first under the fitness weight
+        count = max(1, int(np.ceil(fraction * n)))
+        chosen = np.argsort(-swarm.weight * predicted)[:count]
+
+        evaluated[:] = False
+        evaluated[chosen] = True
+        swarm.fitness[:] = predicted
+
+    positions = swarm.position[evaluated]
+    if batched:
+        values = fitness_fn(positions)
+    else:
+        values = np.array([fitness_fn(position)[0] for position in positions])
+
+    swarm.fitness[evaluated] = values
+    model.add(positions, values)
+    return evaluated
+
+
+class ParticleScreen(object):
+
+    def __init__(self, model):
+        self.model = model
+        self.evaluated = 0
+        self.predicted = 0
+
+    # wraps a per-particle fitness function, returning a fitness tuple. Until
+    # the model is ready, and for particles without a valid best known
+    # position, every call is a real evaluation
+    def __call__(self, evaluate):
+
+        @functools.wraps(evaluate)
+        def screened(particle, *args, **kwargs):
+
+            position = np.asarray(particle, dtype=float)[np.newaxis]
+            best_known = particle.best_known
+            if self.model.ready(position.shape[1]) and best_known is not None and best_known.fitness.valid:
+                predicted = self.model.predict(position)[0]
+                if predicted * particle.fitness.weights[0] <= best_known.fitness.wvalues[0]:
+                    self.predicted += 1
+                    return predicted,
+
+            values = tuple(evaluate(particle, *args, **kwargs))
+            self.model.add(position, np.array(values[:1], dtype=float))
+            self.evaluated += 1
+            return values
+
+        return screened
+
+    def __str__(self):
+        return "{} evaluated, {} predicted".format(self.evaluated, self.predicted)
@@ -0,0 +1,167 @@
+"""
+Vectorised particle swarm
+- Framework: DEAP (toolbox), NumPy
+- Swarm Attributes: position, velocity, best_known, best_fitness, fitness,
+                    best, best_value
+
+Instead of one creator.Particle object per particle, the whole swarm is kept as
+a handful of contiguous arrays:
+
+    position      (n, dim)  current position of every particle
+    velocity      (n, dim)  current velocity of every particle
+    best_known    (n, dim)  best position seen by every particle
+    best_fitness  (n,)      fitness value of best_known
+    fitness       (n,)      fitness value of the current position
+    best          (dim,)    global best position
+    best_value              fitness value of the global best
+
+so moving the swarm is a single vectorised step no matter how many particles
+there are:
+
+    v = w * v + phi_p * r_p * (best_known - curr_pos) + phi_g * r_g * (glob_best - curr_pos)
+
+where r_p, r_g are (n, dim) matrices sampled from uniform(0,1).
+
+Fitness values are maximised to match the weights=(1.0,) fitness used by the
+other scripts. Create the swarm with weight=-1.0 to minimise instead.
+
+For large swarms, generate(..., dtype=np.float32) halves the memory of the
+(n, dim) arrays. updateSwarm works in place on two (n, dim) scratch arrays that
+are allocated with the swarm, so a generation allocates no further (n, dim)
+arrays and the peak memory is five of them: position, velocity, best_known and
+the scratch.
+"""
+import numpy as np
+
+import boundary
+
+
+class Swarm(object):
+
+    def __init__(self, position, velocity, weight=1.0, generator=np.random):
+
+        n = len(position)
+
+        self.position = position
+        self.velocity = velocity
+        self.weight = weight
+        self.generator = generator
+
+        # nothing has been evaluated yet, so every fitness starts at the worst
+        # possible value for the given weight
+        worst = -np.inf if weight > 0 else np.inf
+        self.fitness = np.full(n, worst)
+        self.best_known = position.copy()
+        self.best_fitness = np.full(n, worst)
+
+        self.best = position[0].copy()
+        self.best_value = worst
+
+        # working space for updateSwarm
+        self.scratch = (np.empty_like(position), np.empty_like(position))
+
+    def __len__(self):
+        return len(self.position)
+
+    @property
+    def dim(self):
+        return self.position.shape[1]
+
+    # element-wise comparison of fitness values, true where a is better than b
+    def better(self, a, b):
+        return self.weight * a > self.weight * b
+
+    # the scratch arrays are not worth pickling into a checkpoint
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["scratch"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.scratch = (np.empty_like(self.position), np.empty_like(self.position))
+
+# --------------------------Swarm operations ---------------------------------
+
+# generates and returns a swarm of n particles based on the dim (size) of the
+# problem, with positions and velocities of the given dtype
+def generate(n, size, bound_l, bound_u, weight=1.0, generator=np.random, dtype=np.float64):
+    position = generator.uniform(bound_l, bound_u, (n, size)).astype(dtype, copy=False)
+    bound = abs(bound_u - bound_l)
+    velocity = generator.uniform(-bound, bound, (n, size)).astype(dtype, copy=False)
+    return Swarm(position, velocity, weight=weight, generator=generator)
+
+# fills out with uniform(0, 1) numbers. Generators that can draw straight into
+# an array (np.random.Generator, seeding.SwarmStreams) do so, np.random and a
+# RandomState draw a new array that is copied in
+def uniformInto(generator, out):
+    if isinstance(generator, np.random.Generator):
+        generator.random(out=out, dtype=out.dtype)
+    elif hasattr(generator, "fill"):
+        generator.fill(out)
+    else:
+        out[:] = generator.uniform(0, 1, out.shape)
+
+# evaluates every particle in the swarm. fitness_fn is a batched kernel from
+# optimisation_functions, taking all positions at once and returning one value
+# per particle. With batched=False, fitness_fn is a per-individual function
+# returning a fitness tuple, i.e. what is registered as toolbox.evaluate for
+# creator.Particle, and is called once per particle. Returns a boolean mask of
+# the evaluated particles, which is all of them
+def evaluateSwarm(swarm, fitness_fn, batched=True):
+    if batched:
+        swarm.fitness[:] = fitness_fn(swarm.position)
+    else:
+        swarm.fitness[:] = [fitness_fn(position)[0] for position in swarm.position]
+    return np.ones(len(swarm), dtype=bool)
+
+# updates the best known positions and the global best after an evaluation,
+# returns True if the global best has moved. evaluated is an optional boolean
+# mask of the particles whose fitness is real, e.g. from surrogate pre-screening
+def updateBests(swarm, evaluated=None):
+
+    improved = swarm.better(swarm.fitness, swarm.best_fitness)
+    if evaluated is not None:
+        improved &= evaluated
+    np.copyto(swarm.best_known, swarm.position, where=improved[:, np.newaxis])
+    swarm.best_fitness[improved] = swarm.fitness[improved]
+
+    n = np.argmax(swarm.weight * swarm.best_fitness)
+    if swarm.better(swarm.best_fitness[n], swarm.best_value):
+        swarm.best = swarm.best_known[n].copy()
+        swarm.best_value = swarm.best_fitness[n]
+        return True
+
+    return False
+
+# updating the velocity and position of every particle in the swarm. best
+# defaults to the global best of the swarm. vmax clamps the velocities, and
+# bound is a mode from boundary.py that keeps the particles inside the bounds
+def updateSwarm(swarm, w, phi_p, phi_g, best=None, vmax=None, bound=None):
+
+    if best is None:
+        best = swarm.best
+
+    # v_p and v_g are built in the scratch arrays, which also hold r_p and r_g
+    v, diff = swarm.scratch
+    swarm.velocity *= w
+
+    uniformInto(swarm.generator, v)
+    v *= phi_p
+    np.subtract(swarm.best_known, swarm.position, out=diff)
+    v *= diff
+    swarm.velocity += v
+
+    uniformInto(swarm.generator, v)
+    v *= phi_g
+    np.subtract(best, swarm.position, out=diff)
+    v *= diff
+    swarm.velocity += v
+
+    if vmax is not None:
+        boundary.clampVelocity(swarm.velocity, vmax)
+
+    swarm.position += swarm.velocity
+
+    if bound is not None:
+        bound(swarm.position, swarm.velocity, generator=swarm.generator)
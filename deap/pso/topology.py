@@ -0,0 +1,52 @@
+"""
+Neighbourhood topologies for a swarm.Swarm
+
+With a single global best every particle is pulled towards the same point and
+large swarms collapse early. Instead, each particle can follow the best known
+position within its own neighbourhood (its local best).
+
+A topology is a neighbour table: an (n, k) array of particle indices where row i
+holds the neighbourhood of particle i (including i itself). The table is built
+once, and each generation every local best is found with one gather and argmax
+over the best_fitness array:
+
+    table = ring(len(pop), k=1)
+    toolbox.update(pop, best=localBest(pop, table))
+
+    ring(n, k)              the k particles either side of i, wrapping around
+    vonNeumann(n)           left, right, up and down on a torus of n particles
+    randomK(n, k)           i and k particles picked at random
+"""
+import numpy as np
+
+def ring(n, k=1):
+    offsets = np.arange(-k, k + 1)
+    return (np.arange(n)[:, np.newaxis] + offsets) % n
+
+# the particles are laid out row by row on a grid with `cols` columns that
+# wraps around at the edges. NOTE: if n is not a multiple of cols, the last row
+# is shorter and its up/down neighbours wrap to the start of the swarm
+def vonNeumann(n, cols=None):
+    if cols is None:
+        cols = max(1, int(np.sqrt(n)))
+    index = np.arange(n)
+    col = index % cols
+    row_start = index - col
+    row_len = np.minimum(cols, n - row_start)
+    left = row_start + (col - 1) % row_len
+    right = row_start + (col + 1) % row_len
+    up = (index - cols) % n
+    down = (index + cols) % n
+    return np.stack((index, left, right, up, down), axis=1)
+
+# generator only needs a uniform(low, high, size) method, so np.random, a
+# RandomState or a seeding.SwarmStreams can all be used
+def randomK(n, k, generator=np.random):
+    informants = np.floor(generator.uniform(0, n, (n, k))).astype(int)
+    return np.hstack((np.arange(n)[:, np.newaxis], np.minimum(informants, n - 1)))
+
+# the best known position in the neighbourhood of every particle, (n, dim)
+def localBest(swarm, table):
+    fitness = swarm.weight * swarm.best_fitness[table]
+    best = table[np.arange(len(table)), np.argmax(fitness, axis=1)]
+    return swarm.best_known[best]